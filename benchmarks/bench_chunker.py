@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SmartTextChunker on a large input
+
+Builds a ~10 MB document from the markdown corpus in data/raw/markdown,
+chunks it with the current chunker (precomputed boundaries, bisect lookup)
+and with the original text cleanup and character-by-character backward
+scan, checks that both produce the same chunks and prints the timings.
+
+Usage:
+    python benchmarks/bench_chunker.py
+    python benchmarks/bench_chunker.py --size-mb 50
+"""
+
+import io
+import re
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config.settings import config
+from src.utils.foundation import SmartTextChunker
+
+CORPUS_FOLDER = PROJECT_ROOT / "data" / "raw" / "markdown"
+
+
+class ReferenceChunker(SmartTextChunker):
+    """Original implementation: regex whitespace cleanup and two backward
+    character scans per chunk boundary"""
+
+    def clean_text(self, text):
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        return text.strip()
+
+    def find_sentence_boundary(self, text, ideal_position, boundaries=None):
+        if ideal_position >= len(text):
+            return len(text)
+
+        search_range = min(100, len(text) - ideal_position)
+
+        for i in range(ideal_position, max(0, ideal_position - search_range), -1):
+            if i < len(text) and text[i] in '.!?':
+                if i + 1 < len(text) and text[i + 1] in ' \n':
+                    return i + 1
+
+        for i in range(ideal_position, max(0, ideal_position - search_range), -1):
+            if i < len(text) and text[i] == '\n':
+                return i + 1
+
+        return ideal_position
+
+    def find_boundaries(self, text):
+        return None
+
+
+def timed_chunking(chunker, text):
+    """Chunk text with console output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        chunks = chunker.create_chunks(text, source_info="benchmark")
+        elapsed = time.perf_counter() - start
+    return elapsed, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=10, help='Approximate input size in MB')
+    args = parser.parse_args()
+
+    corpus = "\n\n".join(path.read_text(encoding='utf-8') for path in sorted(CORPUS_FOLDER.rglob("*.md")))
+    target_chars = int(args.size_mb * 1024 * 1024)
+    text = (corpus * (target_chars // len(corpus) + 1))[:target_chars]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunker = SmartTextChunker(config)
+        reference = ReferenceChunker(config)
+
+    print(f"📄 Input: {len(text):,} characters")
+
+    chunk_time, chunks = timed_chunking(chunker, text)
+    reference_time, reference_chunks = timed_chunking(reference, text)
+
+    if chunks != reference_chunks:
+        print("❌ Chunk output differs from the reference implementation")
+        sys.exit(1)
+
+    print(f"✅ {len(chunks):,} chunks, identical to reference")
+    print(f"   🐢 Original:  {reference_time:6.2f} s")
+    print(f"   🚀 Current:   {chunk_time:6.2f} s")
+    print(f"   📈 Throughput: {len(text) / chunk_time / 1024 / 1024:5.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: fused content statistics vs. the original multi-pass version
+
+Runs both implementations over the markdown corpus in data/raw/markdown,
+checks that they produce identical counters and prints the speedup.
+
+Usage:
+    python benchmarks/bench_text_statistics.py
+    python benchmarks/bench_text_statistics.py --repeat 20   # scale the corpus up
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.document_processor.document_processor import ContentStatisticsAccumulator
+
+CORPUS_FOLDER = PROJECT_ROOT / "data" / "raw" / "markdown"
+
+
+def reference_statistics(text):
+    """Original implementation: separate generator passes per counter"""
+    words = text.split()
+
+    def count_syllables(word):
+        word = word.lower()
+        vowels = 'aeiouy'
+        syllable_count = 0
+        prev_was_vowel = False
+        for char in word:
+            is_vowel = char in vowels
+            if is_vowel and not prev_was_vowel:
+                syllable_count += 1
+            prev_was_vowel = is_vowel
+        if word.endswith('e') and syllable_count > 1:
+            syllable_count -= 1
+        return max(1, syllable_count)
+
+    sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+
+    return {
+        'total_characters': len(text),
+        'total_words': len(words),
+        'unique_words': len(set(word.lower() for word in words)),
+        'alphabetic_chars': sum(1 for c in text if c.isalpha()),
+        'numeric_chars': sum(1 for c in text if c.isdigit()),
+        'punctuation_chars': sum(1 for c in text if c in '.,!?;:'),
+        'whitespace_chars': sum(1 for c in text if c.isspace()),
+        'syllables': sum(count_syllables(word) for word in words),
+        'sentences': len(sentences)
+    }
+
+
+def fused_statistics(text):
+    """Fused single-pass engine used by EnhancedPDFReader"""
+    statistics = ContentStatisticsAccumulator()
+    statistics.add_text(text)
+
+    return {
+        'total_characters': statistics.total_chars,
+        'total_words': statistics.total_words,
+        'unique_words': len(statistics.unique_words),
+        'alphabetic_chars': statistics.alphabetic_chars,
+        'numeric_chars': statistics.numeric_chars,
+        'punctuation_chars': statistics.punctuation_chars,
+        'whitespace_chars': statistics.whitespace_chars,
+        'syllables': statistics.total_syllables,
+        'sentences': statistics.sentence_count + (1 if statistics._open_sentence else 0)
+    }
+
+
+def best_time(function, text, rounds):
+    """Best wall-clock time over a few rounds"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=1, help='Concatenate the corpus this many times')
+    parser.add_argument('--rounds', type=int, default=3, help='Timing rounds per implementation')
+    args = parser.parse_args()
+
+    documents = [path.read_text(encoding='utf-8') for path in sorted(CORPUS_FOLDER.rglob("*.md"))]
+    text = "\n".join(documents) * args.repeat
+
+    print(f"📚 Corpus: {len(documents)} documents x {args.repeat} = {len(text):,} characters")
+
+    reference_time, reference = best_time(reference_statistics, text, args.rounds)
+    fused_time, fused = best_time(fused_statistics, text, args.rounds)
+
+    if reference != fused:
+        print("❌ Counters differ:")
+        for key in reference:
+            if reference[key] != fused[key]:
+                print(f"   {key}: reference={reference[key]} fused={fused[key]}")
+        sys.exit(1)
+
+    print("✅ Counters identical")
+    print(f"   🐢 Reference: {reference_time * 1000:8.1f} ms")
+    print(f"   🚀 Fused:     {fused_time * 1000:8.1f} ms")
+    print(f"   📈 Speedup:   {reference_time / fused_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall vs. memory of the FaissVectorStore index settings
+
+Builds every index type / quantization combination over the same vectors,
+measures recall@k against exact search (with and without exact re-ranking
+of a shortlist), query latency and index size, and projects the index
+memory to a target corpus size next to the LLM's footprint, against
+config.MAX_MEMORY_GB.
+
+Vectors come from the embedding cache filled by 03-01 when it exists,
+otherwise from a synthetic clustered set with the embedding dimension.
+Queries are held-out vectors with a little noise added.
+
+Usage:
+    python benchmarks/bench_vector_quantization.py
+    python benchmarks/bench_vector_quantization.py --size 100000 --project-chunks 2000000
+    python benchmarks/bench_vector_quantization.py --index-types ivf --quantizations sq8,opq --rerank 1,4,8
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config.settings import config
+from src.vector_store.vector_storage import FaissVectorStore
+
+EMBEDDING_CACHE_FOLDER = PROJECT_ROOT / "data" / "vector_store" / "embedding_cache"
+
+
+def normalize(vectors):
+    """Unit-length float32 rows"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def load_vectors(size, dimension, seed):
+    """Cached chunk embeddings if available, else a clustered synthetic set"""
+    for vectors_file in sorted(EMBEDDING_CACHE_FOLDER.glob("*/vectors.f32")):
+        meta = json.loads((vectors_file.parent / "meta.json").read_text())
+        cached = np.memmap(vectors_file, dtype=np.float32, mode='r', shape=(meta['count'], meta['dimension']))
+        if len(cached) >= 1000:
+            print(f"📂 Using {min(size, len(cached)):,} cached embeddings from {vectors_file.parent.name}")
+            return normalize(cached[:size])
+
+    print(f"🎲 Using {size:,} synthetic {dimension}-d vectors (no embedding cache found)")
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(16, size // 500), dimension)).astype(np.float32)
+    vectors = centers[rng.integers(len(centers), size=size)] + 0.6 * rng.standard_normal((size, dimension)).astype(np.float32)
+    return normalize(vectors)
+
+
+def exact_top_k(vectors, queries, k):
+    """Ground-truth rows by brute-force inner product"""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def recall_at_k(rows, truth):
+    """Mean fraction of the true top-k found"""
+    return float(np.mean([len(set(found) & set(expected)) / len(expected) for found, expected in zip(rows, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=20000, help='Vectors to index')
+    parser.add_argument('--dimension', type=int, default=384, help='Dimension of synthetic vectors')
+    parser.add_argument('--queries', type=int, default=200, help='Held-out query vectors')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+    parser.add_argument('--index-types', default="flat,ivf,hnsw", help='Comma-separated index types')
+    parser.add_argument('--quantizations', default="none,sq8,pq,opq", help='Comma-separated quantizations')
+    parser.add_argument('--pq-m', type=int, default=config.FAISS_PQ_M, help='PQ bytes per vector (0 = dimension / 8)')
+    parser.add_argument('--rerank', default="1,4", help='Comma-separated rerank factors (1 = no re-ranking)')
+    parser.add_argument('--project-chunks', type=int, default=1000000, help='Corpus size for the memory projection')
+    parser.add_argument('--model-gb', type=float, default=4.9, help='LLM memory (llama3.1:8b Q4 ~4.9 GB)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.size + args.queries, args.dimension, args.seed)
+    rng = np.random.default_rng(args.seed)
+    queries = normalize(vectors[-args.queries:] + 0.05 * rng.standard_normal(vectors[-args.queries:].shape).astype(np.float32))
+    vectors = vectors[:-args.queries]
+    truth = exact_top_k(vectors, queries, args.k)
+    texts = [""] * len(vectors)
+
+    budget_gb = config.MAX_MEMORY_GB
+    print(f"📄 {len(vectors):,} x {vectors.shape[1]} vectors, {len(queries)} queries, recall@{args.k}")
+    print(f"💾 Projection: {args.project_chunks:,} chunks + {args.model_gb} GB model vs MAX_MEMORY_GB = {budget_gb}")
+    print()
+    print(f"{'index':<6} {'quant':<5} {'rerank':>6} {'recall':>7} {'ms/q':>7} {'B/vec':>7} {'index MB':>9} "
+          f"{'proj. GB':>9} {'total GB':>9}  fits")
+
+    for index_type in args.index_types.split(","):
+        for quantization in args.quantizations.split(","):
+            store = FaissVectorStore(None, index_type=index_type, quantization=quantization, pq_m=args.pq_m,
+                                     nlist=config.FAISS_NLIST, nprobe=config.FAISS_NPROBE,
+                                     hnsw_m=config.FAISS_HNSW_M, ef_search=config.FAISS_EF_SEARCH)
+            start = time.perf_counter()
+            store.add_vectors(vectors, texts)
+            build_time = time.perf_counter() - start
+
+            memory = store.memory_usage()
+            projected_gb = memory['bytes_per_vector'] * args.project_chunks / 1024 ** 3
+            total_gb = projected_gb + args.model_gb
+
+            rerank_factors = [1] if store.quantization == "none" else [int(factor) for factor in args.rerank.split(",")]
+            for rerank_factor in rerank_factors:
+                store.rerank_factor = rerank_factor
+                start = time.perf_counter()
+                _, rows = store.search_rows(queries, k=args.k)
+                query_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+                print(f"{index_type:<6} {store.quantization:<5} {rerank_factor:>6} {recall_at_k(rows, truth):>7.3f} "
+                      f"{query_ms:>7.3f} {memory['bytes_per_vector']:>7.0f} {memory['index_bytes'] / 1024 ** 2:>9.1f} "
+                      f"{projected_gb:>9.2f} {total_gb:>9.2f}  {'✅' if total_gb <= budget_gb else '❌'}")
+            print(f"       built in {build_time:.1f} s")
+
+    print()
+    print("B/vec is the in-RAM index size per vector. Re-ranking reads shortlisted rows of the")
+    print("float32 vectors (4 x dim bytes each) from a memory-mapped file, which is not counted.")
+
+
+if __name__ == "__main__":
+    main()
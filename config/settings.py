@@ -13,10 +13,39 @@ class AzureRAGConfig:
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
     
+    # Token-based chunking (all-MiniLM-L6-v2 truncates at 256 tokens incl. special tokens)
+    TOKENIZER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    CHUNK_SIZE_TOKENS = 250
+    CHUNK_OVERLAP_TOKENS = 30
+    
     # AI model settings
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND = "local"   # "local" (sentence-transformers) or "openai"; $EMBEDDING_BACKEND overrides
+    EMBEDDING_BATCH_SIZE = 64
+    EMBEDDING_THREADS = 0         # torch intra-op threads, 0 = torch default
     MAX_MEMORY_GB = 8
     
+    # Vector store backend: "chroma" or "faiss" ($RAG_VECTOR_BACKEND overrides)
+    VECTOR_BACKEND = "chroma"
+    FAISS_INDEX_TYPE = "hnsw"     # "flat" (exact), "ivf" or "hnsw"
+    FAISS_NLIST = 1024            # IVF lists (upper bound, clamped to ~4*sqrt(chunks))
+    FAISS_NPROBE = 16             # IVF lists searched per query
+    FAISS_HNSW_M = 32             # HNSW links per node
+    FAISS_EF_SEARCH = 64          # HNSW search candidates
+    FAISS_QUANTIZATION = "none"   # "none", "sq8", "pq" or "opq" (see benchmarks/bench_vector_quantization.py)
+    FAISS_PQ_M = 0                # PQ bytes per vector, 0 = dimension / 8
+    FAISS_RERANK_FACTOR = 4       # compressed indexes re-rank k * factor candidates exactly
+    
+    # Retrieval cache (0 entries disables it)
+    RETRIEVAL_CACHE_SIZE = 256
+    RETRIEVAL_CACHE_TTL_SECONDS = 3600
+    
+    # Semantic answer cache: paraphrased questions above the cosine threshold
+    # reuse a stored answer (0 entries disables it)
+    SEMANTIC_CACHE_SIZE = 512
+    SEMANTIC_CACHE_THRESHOLD = 0.92
+    SEMANTIC_CACHE_TTL_SECONDS = 86400
+    
     # Processing limits
     MAX_FILES_TO_PROCESS = 10
     
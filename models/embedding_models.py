@@ -0,0 +1,266 @@
+"""
+Embedding Models for Azure RAG
+Local sentence-transformers embedding engine (CPU, batched, offline), a
+factory that picks the embedding backend used by the pipeline scripts and
+a persistent embedding cache keyed by model and content hash
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_BACKENDS = ("local", "openai")
+
+
+class LocalEmbeddingEngine(Embeddings):
+    """LangChain Embeddings backed by a local sentence-transformers model
+
+    Texts are encoded in batches of batch_size on the given device, and
+    every vector is L2-normalized float32, so cosine similarity is a dot
+    product. The model is loaded on first use.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, config=None, batch_size: Optional[int] = None,
+                 num_threads: Optional[int] = None, device: str = "cpu"):
+        """
+        Args:
+            model_name: sentence-transformers model (default: config.EMBEDDING_MODEL)
+            config: AzureRAGConfig supplying the defaults
+            batch_size: Texts per forward pass (default: config.EMBEDDING_BATCH_SIZE)
+            num_threads: Torch intra-op threads; 0/None keeps torch's default
+            device: Torch device for the model
+        """
+        self.model_name = model_name or getattr(config, 'EMBEDDING_MODEL', "all-MiniLM-L6-v2")
+        self.batch_size = batch_size or getattr(config, 'EMBEDDING_BATCH_SIZE', 64)
+        self.num_threads = num_threads if num_threads is not None else getattr(config, 'EMBEDDING_THREADS', 0)
+        self.device = device
+        self._model = None
+
+    @property
+    def model(self):
+        """The sentence-transformers model (loaded lazily)"""
+        if self._model is None:
+            try:
+                import torch
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError("LocalEmbeddingEngine requires sentence-transformers and torch "
+                                  "(pip install sentence-transformers torch)") from e
+
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        """Length of the embedding vectors"""
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a (len(texts), dimension) float32 matrix of unit vectors"""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=len(texts) > 10 * self.batch_size
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain interface: embed a batch of documents"""
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """LangChain interface: embed one query"""
+        return self.encode([text])[0].tolist()
+
+
+def create_embeddings(config=None, backend: Optional[str] = None) -> Embeddings:
+    """Embeddings for the configured backend
+
+    backend defaults to $EMBEDDING_BACKEND, then config.EMBEDDING_BACKEND:
+    "local" (LocalEmbeddingEngine, offline) or "openai" (OpenAIEmbeddings,
+    needs OPENAI_API_KEY). A vector store must be queried with the backend
+    it was built with.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND") or getattr(config, 'EMBEDDING_BACKEND', "local")).lower()
+
+    if backend == "local":
+        return LocalEmbeddingEngine(config=config)
+    if backend == "openai":
+        from langchain_community.embeddings import OpenAIEmbeddings
+        return OpenAIEmbeddings()
+    raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}")
+
+
+def embedding_model_id(embeddings: Embeddings) -> str:
+    """Stable identifier of the model behind an Embeddings object (e.g. local:all-MiniLM-L6-v2)"""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.cache.model_id
+    if isinstance(embeddings, LocalEmbeddingEngine):
+        return f"local:{embeddings.model_name}"
+    model = getattr(embeddings, 'model', None) or getattr(embeddings, 'model_name', None)
+    return f"{type(embeddings).__name__}:{model}" if model else type(embeddings).__name__
+
+
+class EmbeddingCache:
+    """On-disk cache of document embeddings for one model
+
+    Lives in <cache_dir>/<model id>/: vectors.f32 is a row-major float32
+    matrix (memory-mapped for reads), keys.bin the SHA-256 digest of each
+    row's text in the same order, and meta.json the model id, dimension and
+    committed row count. New rows are appended to both files before the
+    count is updated, so a crash mid-append only loses that append.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    KEYS_FILE = "keys.bin"
+    META_FILE = "meta.json"
+    DIGEST_SIZE = 32
+
+    def __init__(self, cache_dir, model_id: str):
+        self.model_id = model_id
+        self.path = Path(cache_dir) / re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.dimension = None
+        self.count = 0
+        meta_file = self.path / self.META_FILE
+        if meta_file.exists():
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('model_id') != model_id:
+                raise ValueError(f"Embedding cache at {self.path} belongs to {meta.get('model_id')!r}, not {model_id!r}")
+            self.dimension = meta['dimension']
+            self.count = meta['count']
+
+        # digest -> row for the committed rows
+        self.index: Dict[bytes, int] = {}
+        if self.count:
+            with open(self.path / self.KEYS_FILE, 'rb') as f:
+                keys = f.read(self.count * self.DIGEST_SIZE)
+            for row in range(self.count):
+                self.index[keys[row * self.DIGEST_SIZE:(row + 1) * self.DIGEST_SIZE]] = row
+        self._vectors = None
+
+    @staticmethod
+    def content_key(text: str) -> bytes:
+        """Cache key of a text: its SHA-256 digest"""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def vectors(self) -> np.ndarray:
+        """Memory-mapped (count, dimension) matrix of the committed rows"""
+        if self._vectors is None or len(self._vectors) != self.count:
+            if not self.count:
+                return np.zeros((0, self.dimension or 0), dtype=np.float32)
+            self._vectors = np.memmap(self.path / self.VECTORS_FILE, dtype=np.float32, mode='r',
+                                      shape=(self.count, self.dimension))
+        return self._vectors
+
+    def lookup(self, keys: List[bytes]) -> Tuple[np.ndarray, List[int]]:
+        """Rows for keys (-1 where missing) and the positions of the missing keys"""
+        rows = np.array([self.index.get(key, -1) for key in keys], dtype=np.int64)
+        return rows, np.flatnonzero(rows < 0).tolist()
+
+    def add(self, keys: List[bytes], vectors: np.ndarray):
+        """Append vectors for keys not yet cached"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d vectors, got {vectors.shape[1]}-d")
+
+        new_rows = []
+        for position, key in enumerate(keys):
+            if key not in self.index:
+                self.index[key] = self.count + len(new_rows)
+                new_rows.append(position)
+        if not new_rows:
+            return
+
+        # Truncate to the committed size first (drops rows of an interrupted append)
+        with open(self.path / self.VECTORS_FILE, 'ab') as f:
+            f.truncate(self.count * self.dimension * 4)
+            f.write(vectors[new_rows].tobytes())
+        with open(self.path / self.KEYS_FILE, 'ab') as f:
+            f.truncate(self.count * self.DIGEST_SIZE)
+            f.write(b''.join(keys[position] for position in new_rows))
+
+        self.count += len(new_rows)
+        with open(self.path / self.META_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'model_id': self.model_id, 'dimension': self.dimension, 'count': self.count}, f)
+
+    def __len__(self):
+        return self.count
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only embeds documents missing from an EmbeddingCache
+
+    Queries are passed straight through; documents are looked up by content
+    hash, the missing ones (deduplicated) are embedded in one call and
+    appended to the cache.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def wrap(cls, embeddings: Embeddings, cache_dir) -> "CachedEmbeddings":
+        """Wrap embeddings with the cache for their model under cache_dir"""
+        return cls(embeddings, EmbeddingCache(cache_dir, embedding_model_id(embeddings)))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a float32 matrix, reusing cached vectors"""
+        keys = [EmbeddingCache.content_key(text) for text in texts]
+        rows, missing = self.cache.lookup(keys)
+
+        if missing:
+            # Embed each distinct missing text once
+            first_position = {}
+            for position in missing:
+                first_position.setdefault(keys[position], position)
+            positions = list(first_position.values())
+            new_vectors = np.asarray(self.embeddings.embed_documents([texts[p] for p in positions]),
+                                     dtype=np.float32)
+            self.cache.add([keys[p] for p in positions], new_vectors)
+            rows, _ = self.cache.lookup(keys)
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if not texts:
+            return np.zeros((0, self.cache.dimension or 0), dtype=np.float32)
+        return np.asarray(self.cache.vectors()[rows])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain interface: embed documents through the cache"""
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """LangChain interface: queries are not cached"""
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and cache size"""
+        lookups = self.hits + self.misses
+        return {
+            'model_id': self.cache.model_id,
+            'cached_vectors': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
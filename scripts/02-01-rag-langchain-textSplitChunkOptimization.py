@@ -1,73 +1,272 @@
 
 # imports
 import os
+import sys
 import glob
+import json
+import shutil
 import pickle
+import hashlib
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# project modules (config, cached token counter, markdown section chunker)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import config
+from src.utils.foundation import TokenCounter, MarkdownSectionChunker
+
 
 # import or LangChain
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 
 
 # vector store
 db_name = "vector_db"
 
-
-# read all text files from the directory and subdirectories using LangChain DirectoryLoader
-from pathlib import Path
-
 # Get the current file's directory, go up one level, then to data/raw/markdown
 base_path = Path(__file__).parent.parent / "data" / "raw" / "markdown"
-folders_path = [d for d in os.listdir(base_path) 
-                 if os.path.isdir(os.path.join(base_path, d)) and not d.startswith('.')]
-documents_list = []
-for folder in folders_path:
-    doc_type = os.path.basename(folder)
-    #print(f"Processing folder: {doc_type}")
-    
-    loader = DirectoryLoader(base_path / folder, glob="**/*.md", loader_cls=TextLoader)
-    folder_docs = loader.load()
-    #print(f"Loaded {len(folder_docs)} documents from {doc_type}")
-    
-    for doc in folder_docs:
-        #print(f"{doc}")
+chunks_dir = Path(__file__).parent.parent / "data" / "processed"
+# Incremental ingestion: one cached pickle frame per source file, tracked by a manifest
+chunk_cache_dir = chunks_dir / "chunk_cache"
+manifest_file = chunks_dir / "chunk_manifest.json"
+
+# CHUNK_UNIT=tokens (default) sizes chunks by embedding-model tokens so they pack tightly
+# to CHUNK_SIZE_TOKENS; CHUNK_UNIT=characters keeps the original 1000-character chunks
+chunk_unit = os.getenv("CHUNK_UNIT", "tokens")
+# CHUNK_STRATEGY=sections (default) chunks along the markdown heading tree and keeps tables and
+# image references whole; CHUNK_STRATEGY=recursive uses the plain separator-based splitter
+chunk_strategy = os.getenv("CHUNK_STRATEGY", "sections")
+# CHUNK_WORKERS sets the process pool size (defaults to the CPU count)
+chunk_workers = int(os.getenv("CHUNK_WORKERS", "0")) or os.cpu_count() or 1
+
+
+# Per-worker chunking state, built once by init_worker()
+_token_counter = None
+_section_chunker = None
+_text_splitter = None
+
+
+def init_worker(chunk_unit, chunk_strategy):
+    """Build the tokenizer and splitter once per worker process"""
+    global _token_counter, _section_chunker, _text_splitter
+    
+    import io
+    import contextlib
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        _token_counter = TokenCounter(config) if chunk_unit == "tokens" else None
+        
+        if chunk_strategy == "sections":
+            _section_chunker = MarkdownSectionChunker(config, token_counter=_token_counter)
+        elif _token_counter is not None:
+            _text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=config.CHUNK_SIZE_TOKENS,
+                chunk_overlap=config.CHUNK_OVERLAP_TOKENS, # Overlap between chunks
+                length_function=_token_counter.count, # cached, the splitter re-measures the same pieces
+                separators=["\n\n", "\n", " ", ""]
+            )
+        else:
+            _text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=1000, 
+                chunk_overlap=200, # Overlap between chunks
+                separators=["\n\n", "\n", " ", ""]
+            )
+
+
+def list_markdown_files(base_path):
+    """All markdown files under base_path as (path, doc_type) pairs, doc_type = top-level folder"""
+    folders = sorted(d for d in os.listdir(base_path)
+                     if os.path.isdir(os.path.join(base_path, d)) and not d.startswith('.'))
+    files = []
+    for folder in folders:
+        for file_path in sorted((base_path / folder).glob("**/*.md")):
+            files.append((file_path, folder))
+    return files
+
+
+def chunk_file(task):
+    """Load one markdown file and split it into chunks (runs in a worker process)
+    
+    Returns the chunk Documents and their token counts (empty in character mode).
+    """
+    file_path, doc_type = task
+    
+    documents = TextLoader(str(file_path)).load()
+    for doc in documents:
         doc.metadata['doc_type'] = doc_type # Adding additional doc_type to metadata
-        documents_list.append(doc)
-        #print(f"Document metadata:{doc.metadata} \n\n\n-------\\n")
-    
-# check | output looks good
-# for document in documents_list[:10]:
-#     print(f"{document}")
-#     pass
-# print(f"\n\nTotal documents loaded: {len(documents_list)}")
-# print(f"Type of first document: {type(documents_list[0])}")
-# print(f"Instance attributes: {documents_list[0].__dict__.keys()}")
-# print(f"Content of first document: {documents_list[0]}")
-
-
-# # check Attributes of the first two documents | output looks good
-# for i, document in enumerate(documents_list[:2]):
-#     print(f"\nDocument {i}:")
-#     print(f"  Type: {type(document)}")
-#     print(f"  Attributes: {list(document.__dict__.keys())}")
-#     print(f"  Id: {document.id}")
-#     print(f"  Metadata: {document.metadata}")
-#     print(f"  Content preview: {document.page_content[:100]}...")
-#     print(f"  {'-'*60}")
-    
-    
-    
-# Initialize text splitter for chunking
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000, 
-    chunk_overlap=200, # Overlap between chunks
-    separators=["\n\n", "\n", " ", ""]
-)
-# Split documents into chunks
-documents_chunks = text_splitter.split_documents(documents_list)
-# print(f"\n\nTotal documents chunks created: {len(documents_chunks)}\n")
+    
+    if _section_chunker is not None:
+        chunks = []
+        token_counts = []
+        for doc in documents:
+            for chunk in _section_chunker.iter_chunks(doc.page_content.splitlines(keepends=True),
+                                                      doc.metadata.get('source', 'Unknown')):
+                metadata = dict(doc.metadata)
+                metadata['section_path'] = chunk['section_path']
+                metadata['start_index'] = chunk['char_start']
+                chunks.append(Document(page_content=chunk['content'], metadata=metadata))
+                if 'token_count' in chunk:
+                    token_counts.append(chunk['token_count'])
+        return chunks, token_counts
+    
+    chunks = _text_splitter.split_documents(documents)
+    token_counts = [_token_counter.count(chunk.page_content) for chunk in chunks] if _token_counter else []
+    return chunks, token_counts
+
+
+def iter_chunked_files(files, max_workers):
+    """Chunk files on a process pool, yielding results in file order as they complete
+    
+    At most 2 * max_workers files are in flight, so memory stays bounded no
+    matter how large the markdown tree is.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                             initargs=(chunk_unit, chunk_strategy)) as executor:
+        pending = deque()
+        for task in files:
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(chunk_file, task))
+        while pending:
+            yield pending.popleft().result()
+
+
+def chunking_settings():
+    """Settings that change the chunk output; a change invalidates the whole cache"""
+    settings = {'chunk_unit': chunk_unit, 'chunk_strategy': chunk_strategy}
+    if chunk_unit == "tokens":
+        settings.update(tokenizer=config.TOKENIZER_MODEL,
+                        chunk_size=config.CHUNK_SIZE_TOKENS,
+                        chunk_overlap=config.CHUNK_OVERLAP_TOKENS)
+    else:
+        settings.update(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    return settings
+
+
+def file_content_hash(file_path):
+    """SHA-256 of the file's bytes, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(settings):
+    """Previous manifest entries, or none if missing or built with other settings"""
+    if not manifest_file.exists():
+        return {}
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {manifest_file}: {e}")
+        return {}
+    if manifest.get('settings') != settings:
+        print("Chunking settings changed, re-chunking every file")
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(settings, entries):
+    """Write the manifest atomically"""
+    temp_file = manifest_file.with_suffix(".json.tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump({'settings': settings, 'updated_at': datetime.now().isoformat(), 'files': entries}, f, indent=2)
+    os.replace(temp_file, manifest_file)
+
+
+def plan_changes(files, previous):
+    """Split files into reusable manifest entries and files to re-chunk
+    
+    A file whose size and mtime match its entry is reused without reading
+    it; otherwise its content hash decides. Returns (entries, changed, deleted)
+    where entries maps relative path -> entry for every reusable file.
+    """
+    entries = {}
+    changed = []
+    
+    for file_path, doc_type in files:
+        key = file_path.relative_to(base_path).as_posix()
+        stat = file_path.stat()
+        entry = previous.get(key)
+        cache_file = chunk_cache_dir / entry['cache'] if entry and entry.get('cache') else None
+        
+        if entry and entry['doc_type'] == doc_type and (cache_file is None or cache_file.exists()):
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                entries[key] = entry
+                continue
+            content_hash = file_content_hash(file_path)
+            if entry['hash'] == content_hash:
+                entries[key] = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                continue
+        
+        changed.append((file_path, doc_type))
+    
+    current = {file_path.relative_to(base_path).as_posix() for file_path, _ in files}
+    deleted = [key for key in previous if key not in current]
+    return entries, changed, deleted
+
+
+def update_chunk_cache(changed, entries, max_workers):
+    """Chunk the changed files on the process pool and store one frame per file"""
+    chunk_cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Fingerprint before chunking so an edit made mid-run is picked up next time
+    fingerprints = [(file_content_hash(file_path), file_path.stat()) for file_path, _ in changed]
+    
+    for (file_path, doc_type), (content_hash, stat), (chunks, token_counts) in zip(
+            changed, fingerprints, iter_chunked_files(changed, max_workers)):
+        key = file_path.relative_to(base_path).as_posix()
+        cache_name = None
+        
+        if chunks:
+            cache_name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:24] + ".pkl"
+            with open(chunk_cache_dir / cache_name, "wb") as f:
+                pickle.dump(chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        entries[key] = {
+            'doc_type': doc_type,
+            'hash': content_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'cache': cache_name,
+            'chunks': len(chunks),
+            'token_total': sum(token_counts),
+            'token_max': max(token_counts, default=0)
+        }
+        print(f"   Chunked {key}: {len(chunks)} chunks")
+
+
+def prune_chunk_cache(entries):
+    """Drop cached frames no manifest entry refers to (deleted files, old settings)"""
+    if not chunk_cache_dir.exists():
+        return
+    referenced = {entry['cache'] for entry in entries.values() if entry['cache']}
+    for cache_file in chunk_cache_dir.glob("*.pkl"):
+        if cache_file.name not in referenced:
+            cache_file.unlink()
+
+
+def write_chunks(files, entries, output_file):
+    """Concatenate the cached per-file frames into output_file in file order
+    
+    Each cache file is exactly one pickle frame, so frames are copied as
+    bytes without unpickling. The output replaces output_file atomically.
+    """
+    temp_file = output_file.with_suffix(output_file.suffix + ".tmp")
+    with open(temp_file, "wb") as out:
+        for file_path, _ in files:
+            cache_name = entries[file_path.relative_to(base_path).as_posix()]['cache']
+            if cache_name:
+                with open(chunk_cache_dir / cache_name, "rb") as f:
+                    shutil.copyfileobj(f, out)
+    os.replace(temp_file, output_file)
+
 
 # # Check the first few chunks, note overlap content | output looks good, we can see the overlapping content
 # for i, chunk in enumerate(documents_chunks[:5]):
@@ -77,13 +276,6 @@ documents_chunks = text_splitter.split_documents(documents_list)
 #     print(f"  Metadata: {chunk.metadata}")
 #     print(f"  Content preview: {chunk.page_content[:5000]}...")
 #     print(f"  {'-'*60}\n")
-    
-    
-# printing all doc_type from chunk metadata  | output looks good
-# Unique doc_types in chunks: {'load-balancer', 'azure-network-foundation-services', 'azure-vnet', 'azure-network-security-group'}
-doc_types = set(chunk.metadata['doc_type'] for chunk in documents_chunks)
-#print(f"\n\nUnique doc_types in chunks: {doc_types}\n")
-
 
 
 # # Simple text search for word "pool" | output looks good
@@ -99,11 +291,46 @@ doc_types = set(chunk.metadata['doc_type'] for chunk in documents_chunks)
 #     print("-" * 50)
 
 
-# saving chunks to a pickle file
-# Save chunks for vector store
-chunks_dir = Path(__file__).parent.parent / "data" / "processed"
-chunks_dir.mkdir(parents=True, exist_ok=True)
+def main():
+    files = list_markdown_files(base_path)
+    settings = chunking_settings()
+    rebuild = "--rebuild" in sys.argv[1:]
+    
+    previous = {} if rebuild else load_manifest(settings)
+    entries, changed, deleted = plan_changes(files, previous)
+    print(f"Found {len(files)} markdown files: {len(files) - len(changed)} unchanged, "
+          f"{len(changed)} to chunk, {len(deleted)} deleted")
+    
+    # saving chunks to a pickle file
+    # Save chunks for vector store
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+    output_file = chunks_dir / "documents_chunks.pkl"
+    
+    if changed:
+        print(f"Chunking with {min(chunk_workers, len(changed))} worker processes")
+        update_chunk_cache(changed, entries, min(chunk_workers, len(changed)))
+    for key in deleted:
+        print(f"   Removed {key}")
+    prune_chunk_cache(entries)
+    
+    if changed or deleted or not output_file.exists():
+        write_chunks(files, entries, output_file)
+    save_manifest(settings, entries)
+    
+    total_chunks = sum(entry['chunks'] for entry in entries.values())
+    token_total = sum(entry.get('token_total', 0) for entry in entries.values())
+    if token_total:
+        print(f"Token chunking: {total_chunks} chunks, "
+              f"avg {token_total / total_chunks:.0f} / max {max(entry['token_max'] for entry in entries.values())} tokens "
+              f"(budget {config.CHUNK_SIZE_TOKENS})")
+    
+    # printing all doc_type from chunk metadata  | output looks good
+    # Unique doc_types in chunks: {'load-balancer', 'azure-network-foundation-services', 'azure-vnet', 'azure-network-security-group'}
+    doc_types = set(entry['doc_type'] for entry in entries.values() if entry['chunks'])
+    #print(f"\n\nUnique doc_types in chunks: {doc_types}\n")
+    
+    print(f"Saved {total_chunks} chunks to {output_file}")
+
 
-with open(chunks_dir / "documents_chunks.pkl", "wb") as f:
-    pickle.dump(documents_chunks, f)
-print(f"Saved {len(documents_chunks)} chunks to {chunks_dir / 'documents_chunks.pkl'}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 
 # imports
 import os
+import sys
+import hashlib
 from pathlib import Path
 import pickle
 
+# Project modules (vector store build marker, embedding backends)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import config
+from models.embedding_models import CachedEmbeddings, create_embeddings, embedding_model_id
+from src.retrieval.retrieval_cache import read_build_marker, write_build_marker
+
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
+
+COLLECTION_NAME = "azure_docs"
+# Chroma rejects very large add/update/delete calls; sync in batches of this size
+SYNC_BATCH_SIZE = 1000
 
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -22,8 +33,15 @@ def load_chunks(chunks_file):
     """Load the processed document chunks"""
     if chunks_file.exists():
         print(f"Loading chunks from {chunks_file}")
+        # 02-01 streams one pickle frame (a list of chunks) per source file;
+        # older files hold a single frame with every chunk
+        chunks = []
         with open(chunks_file, "rb") as f:
-            chunks = pickle.load(f)
+            while True:
+                try:
+                    chunks.extend(pickle.load(f))
+                except EOFError:
+                    break
         print(f"Loaded {len(chunks)} chunks")
         return chunks
     else:
@@ -32,23 +50,51 @@ def load_chunks(chunks_file):
         return None
 
 # Initialize embeddings
-def setup_embeddings():
-    """Setup embedding model"""
-    # Option 1: OpenAI (requires API key)
-    # Make sure you have OPENAI_API_KEY in your environment
-    try:
-        embeddings = OpenAIEmbeddings()
-        print("Using OpenAI embeddings")
-        return embeddings
-    except Exception as e:
-        print(f"OpenAI embeddings failed: {e}")
-        
-    return embeddings
+def setup_embeddings(cache_dir):
+    """Setup embedding model (chunks already embedded are served from cache_dir)"""
+    # EMBEDDING_BACKEND=local (default): sentence-transformers on the CPU, no network
+    # EMBEDDING_BACKEND=openai: OpenAI API (requires OPENAI_API_KEY)
+    # 04-01 must use the same backend to query the store
+    embeddings = create_embeddings(config)
+    print(f"Using embeddings: {embedding_model_id(embeddings)}")
+    
+    # Vectors are cached per (model, chunk content hash) outside chroma_db,
+    # so a rebuild only embeds new or changed chunks
+    cached_embeddings = CachedEmbeddings.wrap(embeddings, cache_dir)
+    print(f"Embedding cache: {len(cached_embeddings.cache)} vectors in {cached_embeddings.cache.path}")
+    return cached_embeddings
     
 
+def chunk_ids(chunks):
+    """Stable ids derived from each chunk's source and content
+    
+    An unchanged chunk keeps its id across re-chunking, so a sync only
+    touches what changed. Exact duplicates within a source share an id and
+    are indexed once (returned positions are the kept chunks).
+    """
+    ids, keep = [], []
+    seen = set()
+    for position, chunk in enumerate(chunks):
+        key = f"{chunk.metadata.get('source', '')}\0{chunk.page_content}"
+        chunk_id = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        if chunk_id not in seen:
+            seen.add(chunk_id)
+            ids.append(chunk_id)
+            keep.append(position)
+    return ids, keep
+
+
+def print_embedding_stats(embeddings):
+    """Report how many chunk vectors came from the embedding cache"""
+    if isinstance(embeddings, CachedEmbeddings):
+        cache_stats = embeddings.stats()
+        print(f"Embedding cache: {cache_stats['hits']} reused, {cache_stats['misses']} embedded, "
+              f"{cache_stats['cached_vectors']} cached")
+
+
 # Create vector store
 def create_vector_store(chunks, embeddings, persist_dir):
-    """Create and populate Chroma vector store"""
+    """Create and populate Chroma vector store from scratch"""
     
     # Delete existing directory to avoid duplicates
     if persist_dir.exists():
@@ -59,17 +105,95 @@ def create_vector_store(chunks, embeddings, persist_dir):
     # Create fresh directory
     persist_dir.mkdir(parents=True, exist_ok=True)
     print(f"Creating fresh vector store in {persist_dir}")
-   
     
-    # Create Chroma vector store
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
+    ids, keep = chunk_ids(chunks)
+    documents = [chunks[position] for position in keep]
+    
+    # Create Chroma vector store (content-derived ids, so later runs can sync)
+    vectorstore = Chroma(
+        embedding_function=embeddings,
         persist_directory=str(persist_dir),
-        collection_name="azure_docs"
+        collection_name=COLLECTION_NAME
     )
+    for start in range(0, len(documents), SYNC_BATCH_SIZE):
+        vectorstore.add_documents(documents[start:start + SYNC_BATCH_SIZE], ids=ids[start:start + SYNC_BATCH_SIZE])
     
     print(f"Vector store created with {vectorstore._collection.count()} documents")
+    print_embedding_stats(embeddings)
+    
+    # New build id: retrieval caches watching this marker drop their entries;
+    # the model id lets later syncs and 04-01 detect a changed embedding model
+    write_build_marker(persist_dir, documents=len(documents), embedding_model=embedding_model_id(embeddings))
+    return vectorstore
+
+
+def existing_entries(collection):
+    """id -> metadata of everything in a Chroma collection (read in pages)"""
+    entries = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=SYNC_BATCH_SIZE, offset=offset)
+        for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+            entries[chunk_id] = metadata or {}
+        if len(page["ids"]) < SYNC_BATCH_SIZE:
+            return entries
+        offset += SYNC_BATCH_SIZE
+
+
+def sync_vector_store(chunks, embeddings, persist_dir):
+    """Bring an existing Chroma store in line with the current chunks
+    
+    Chunks are matched by content-derived id: new ids are embedded and
+    added, ids no longer present are deleted, and chunks whose metadata
+    changed (e.g. start_index after an edit earlier in the file) are
+    updated in place without re-embedding. Work is proportional to the
+    change, not the corpus. A store built with a different embedding model
+    (or with no recorded model) is rebuilt from scratch.
+    """
+    if not persist_dir.exists():
+        return create_vector_store(chunks, embeddings, persist_dir)
+    
+    model_id = embedding_model_id(embeddings)
+    built_with = read_build_marker(persist_dir).get('embedding_model')
+    if built_with != model_id:
+        print(f"Vector store was built with {built_with or 'an unrecorded embedding model'}, "
+              f"not {model_id}: rebuilding")
+        return create_vector_store(chunks, embeddings, persist_dir)
+    
+    vectorstore = Chroma(
+        embedding_function=embeddings,
+        persist_directory=str(persist_dir),
+        collection_name=COLLECTION_NAME
+    )
+    collection = vectorstore._collection
+    
+    ids, keep = chunk_ids(chunks)
+    wanted = {chunk_id: chunks[position] for chunk_id, position in zip(ids, keep)}
+    existing = existing_entries(collection)
+    
+    to_add = [chunk_id for chunk_id in ids if chunk_id not in existing]
+    to_delete = [chunk_id for chunk_id in existing if chunk_id not in wanted]
+    to_update = [chunk_id for chunk_id in ids
+                 if chunk_id in existing and existing[chunk_id] != wanted[chunk_id].metadata]
+    print(f"Syncing {persist_dir}: {len(existing)} stored, {len(ids)} current chunks -> "
+          f"{len(to_add)} to add, {len(to_update)} to update, {len(to_delete)} to delete")
+    
+    for start in range(0, len(to_delete), SYNC_BATCH_SIZE):
+        collection.delete(ids=to_delete[start:start + SYNC_BATCH_SIZE])
+    for start in range(0, len(to_update), SYNC_BATCH_SIZE):
+        batch = to_update[start:start + SYNC_BATCH_SIZE]
+        collection.update(ids=batch, metadatas=[wanted[chunk_id].metadata for chunk_id in batch])
+    for start in range(0, len(to_add), SYNC_BATCH_SIZE):
+        batch = to_add[start:start + SYNC_BATCH_SIZE]
+        vectorstore.add_documents([wanted[chunk_id] for chunk_id in batch], ids=batch)
+    
+    print(f"Vector store synced, {collection.count()} documents")
+    print_embedding_stats(embeddings)
+    
+    # Only a real change invalidates the retrieval caches
+    if to_add or to_update or to_delete:
+        write_build_marker(persist_dir, documents=len(ids), added=len(to_add),
+                           updated=len(to_update), deleted=len(to_delete), embedding_model=model_id)
     return vectorstore
 
 def test_search(vectorstore):
@@ -109,6 +233,8 @@ def main():
     # Define paths
     chunks_file = Path(__file__).parent.parent / "data" / "processed" / "documents_chunks.pkl"
     persist_dir = Path(__file__).parent.parent / "data" / "vector_store" / "chroma_db"
+    embedding_cache_dir = Path(__file__).parent.parent / "data" / "vector_store" / "embedding_cache"
+    rebuild = "--rebuild" in sys.argv[1:]
     
     # Step 1: Load chunks
     chunks = load_chunks(chunks_file)
@@ -116,10 +242,13 @@ def main():
         return
     
     # Step 2: Setup embeddings
-    embeddings = setup_embeddings()
+    embeddings = setup_embeddings(embedding_cache_dir)
     
-    # Step 3: Create vector store
-    vectorstore = create_vector_store(chunks, embeddings, persist_dir)
+    # Step 3: Create vector store (--rebuild wipes it, otherwise sync the changes)
+    if rebuild:
+        vectorstore = create_vector_store(chunks, embeddings, persist_dir)
+    else:
+        vectorstore = sync_vector_store(chunks, embeddings, persist_dir)
     
     # Step 4: Test search functionality
     test_search(vectorstore)
@@ -17,9 +17,11 @@ import subprocess
 import json
 from typing import List, Dict, Any
 
+# Project modules (config, hybrid retriever)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 # LangChain imports
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
 from langchain.chains import RetrievalQA
@@ -39,32 +41,47 @@ class AzureRAGOllama:
                  vector_db_path: str = None,
                  model_name: str = "llama3.1:8b",
                  collection_name: str = "azure_docs",
-                 ollama_host: str = "http://localhost:11434"):
+                 ollama_host: str = "http://localhost:11434",
+                 retrieval_mode: str = None,
+                 vector_backend: str = None):
         """
         Initialize RAG system with Ollama
         
         Args:
-            vector_db_path: Path to existing Chroma vector database
+            vector_db_path: Path to existing Chroma vector database (or FAISS index folder)
             model_name: Ollama model name
             collection_name: Chroma collection name
             ollama_host: Ollama server URL
+            retrieval_mode: "hybrid" (BM25 + vector search fused with RRF) or
+                "dense" (vector search only); defaults to $RAG_RETRIEVAL_MODE or "hybrid"
+            vector_backend: "chroma" or "faiss" (FaissVectorStore, built from the
+                chunks on first use); defaults to $RAG_VECTOR_BACKEND or config.VECTOR_BACKEND
         """
+        from config.settings import config
+        
         # Set up paths relative to script location (matching your structure)
         base_path = Path(__file__).parent.parent
-        self.vector_db_path = vector_db_path or str(base_path / "data" / "vector_store" / "chroma_db")
+        self.vector_backend = vector_backend or os.getenv("RAG_VECTOR_BACKEND", config.VECTOR_BACKEND)
+        default_store = "faiss_index" if self.vector_backend == "faiss" else "chroma_db"
+        self.vector_db_path = vector_db_path or str(base_path / "data" / "vector_store" / default_store)
         self.chunks_file = base_path / "data" / "processed" / "documents_chunks.pkl"
         
         self.model_name = model_name
         self.collection_name = collection_name
         self.ollama_host = ollama_host
+        self.retrieval_mode = retrieval_mode or os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
         self.vectorstore = None
+        self.retriever = None
+        self.embeddings = None
+        self.answer_cache = None
         self.llm = None
         self.qa_chain = None
         
         print(f"🚀 Azure RAG System with Ollama")
-        print(f"📚 Vector DB: {self.vector_db_path}")
+        print(f"📚 Vector DB: {self.vector_db_path} ({self.vector_backend})")
         print(f"🤖 Model: {self.model_name}")
         print(f"🔗 Ollama: {self.ollama_host}")
+        print(f"🔀 Retrieval: {self.retrieval_mode}")
         
     def check_ollama_status(self) -> bool:
         """Check if Ollama is installed and running"""
@@ -157,29 +174,51 @@ class AzureRAGOllama:
             return False
     
     def load_vector_store(self) -> bool:
-        """Load existing Chroma vector database"""
+        """Load existing Chroma vector database (or the FAISS index)"""
         try:
             print(f"📚 Loading vector store from: {self.vector_db_path}")
             
-            # Check if vector store exists
-            if not Path(self.vector_db_path).exists():
+            # Check if vector store exists (the FAISS index is built on demand)
+            if self.vector_backend != "faiss" and not Path(self.vector_db_path).exists():
                 print(f"❌ Vector store not found at {self.vector_db_path}")
                 print("💡 Please run 03-01-rag-vector-store-chroma.py first")
                 return False
             
-            # Initialize OpenAI embeddings (same as used during creation)
-            embeddings = OpenAIEmbeddings()
+            # Same embedding backend as used during creation ($EMBEDDING_BACKEND)
+            from config.settings import config
+            from models.embedding_models import create_embeddings, embedding_model_id
             
-            # Load existing Chroma database
-            self.vectorstore = Chroma(
-                persist_directory=self.vector_db_path,
-                embedding_function=embeddings,
-                collection_name=self.collection_name
-            )
+            embeddings = create_embeddings(config)
+            self.embeddings = embeddings
+            print(f"🧮 Embeddings: {embedding_model_id(embeddings)}")
+            
+            if self.vector_backend == "faiss":
+                self.vectorstore = self.load_faiss_store(embeddings)
+                if self.vectorstore is None:
+                    return False
+                count = len(self.vectorstore)
+            else:
+                # Query vectors must come from the model the store was built with
+                from src.retrieval.retrieval_cache import read_build_marker
+                
+                model_id = embedding_model_id(embeddings)
+                built_with = read_build_marker(self.vector_db_path).get('embedding_model')
+                if built_with != model_id:
+                    print(f"❌ Vector store was built with {built_with or 'an unrecorded embedding model'}, "
+                          f"but queries would use {model_id}")
+                    print("💡 Rebuild it with: python scripts/03-01-rag-vector-store-chroma.py --rebuild "
+                          "(or set EMBEDDING_BACKEND to the backend it was built with)")
+                    return False
+                
+                # Load existing Chroma database
+                self.vectorstore = Chroma(
+                    persist_directory=self.vector_db_path,
+                    embedding_function=embeddings,
+                    collection_name=self.collection_name
+                )
+                count = self.vectorstore._collection.count()
             
             # Test vector store
-            collection = self.vectorstore._collection
-            count = collection.count()
             print(f"✅ Vector store loaded successfully. Document count: {count}")
             
             # Quick test search
@@ -191,9 +230,81 @@ class AzureRAGOllama:
             
         except Exception as e:
             print(f"❌ Error loading vector store: {e}")
-            print("💡 Make sure you have OPENAI_API_KEY set and vector store created")
+            print("💡 Make sure the vector store was created with the same EMBEDDING_BACKEND "
+                  "(and OPENAI_API_KEY is set for the openai backend)")
             return False
     
+    def load_faiss_store(self, embeddings):
+        """Open the FAISS index, (re)building it from the 02-01 chunks when missing or stale
+        
+        Stale means older than the chunks file, built with a different
+        FAISS_INDEX_TYPE / FAISS_QUANTIZATION than configured, or built
+        with another embedding model or dimension than the query embeddings.
+        """
+        from config.settings import config
+        from models.embedding_models import embedding_model_id
+        from src.vector_store.vector_storage import FaissVectorStore
+        
+        index_dir = Path(self.vector_db_path)
+        index_config = index_dir / FaissVectorStore.CONFIG_FILE
+        search_params = {'nprobe': config.FAISS_NPROBE, 'ef_search': config.FAISS_EF_SEARCH,
+                         'rerank_factor': config.FAISS_RERANK_FACTOR}
+        model_id = embedding_model_id(embeddings)
+        
+        def embedded_with(store):
+            """Whether the index vectors come from the query embedding model"""
+            if store.embedding_model != model_id:
+                return False
+            dimension = getattr(embeddings, 'dimension', None) or len(embeddings.embed_query("Azure"))
+            return store.dimension == dimension
+        
+        if not self.chunks_file.exists():
+            if index_config.exists():
+                store = FaissVectorStore.load_local(index_dir, embeddings, **search_params)
+                if embedded_with(store):
+                    return store
+                print(f"❌ FAISS index was built with {store.embedding_model or 'an unrecorded embedding model'} "
+                      f"({store.dimension}-d), but queries would use {model_id}")
+                print("💡 Run 02-01-rag-langchain-textSplitChunkOptimization.py so the index can be rebuilt")
+                return None
+            print(f"❌ Chunks file not found at {self.chunks_file}")
+            print("💡 Please run 02-01-rag-langchain-textSplitChunkOptimization.py first")
+            return None
+        
+        if index_config.exists() and index_config.stat().st_mtime >= self.chunks_file.stat().st_mtime:
+            store = FaissVectorStore.load_local(index_dir, embeddings, **search_params)
+            # Compare what was asked for: a small corpus may have been built with a fallback
+            built_for = (store.index_type, store.requested_quantization)
+            if built_for == (config.FAISS_INDEX_TYPE, config.FAISS_QUANTIZATION):
+                if embedded_with(store):
+                    return store
+                print(f"⚠️  FAISS index was built with {store.embedding_model or 'an unrecorded embedding model'} "
+                      f"({store.dimension}-d), rebuilding for {model_id}")
+        
+        from models.embedding_models import CachedEmbeddings
+        from src.retrieval.hybrid_retriever import load_chunk_documents
+        from src.retrieval.retrieval_cache import write_build_marker
+        
+        documents = load_chunk_documents(self.chunks_file)
+        print(f"🏗️  Building FAISS {config.FAISS_INDEX_TYPE} index ({config.FAISS_QUANTIZATION} quantization) "
+              f"over {len(documents)} chunks")
+        
+        # Chunk vectors come from the embedding cache 03-01 fills
+        cached_embeddings = CachedEmbeddings.wrap(embeddings, index_dir.parent / "embedding_cache")
+        store = FaissVectorStore.from_documents(
+            documents, cached_embeddings,
+            index_type=config.FAISS_INDEX_TYPE,
+            nlist=config.FAISS_NLIST,
+            hnsw_m=config.FAISS_HNSW_M,
+            quantization=config.FAISS_QUANTIZATION,
+            pq_m=config.FAISS_PQ_M,
+            **search_params
+        )
+        store.embedding = embeddings
+        store.save_local(index_dir)
+        write_build_marker(index_dir, documents=len(documents), backend="faiss", embedding_model=model_id)
+        return store
+    
     def initialize_ollama_llm(self) -> bool:
         """Initialize Ollama LLM"""
         try:
@@ -231,6 +342,65 @@ class AzureRAGOllama:
             print(f"❌ Error initializing Ollama LLM: {e}")
             return False
     
+    def create_retriever(self):
+        """Retriever for the RAG chain, behind the retrieval cache when enabled"""
+        from config.settings import config
+        
+        retriever = self.create_base_retriever()
+        if config.RETRIEVAL_CACHE_SIZE > 0:
+            from src.retrieval.retrieval_cache import CachedRetriever
+            
+            # Keyed on the normalized question, k and mode; cleared when 03-01 rebuilds the store
+            retriever = CachedRetriever.wrap(retriever, config, persist_dir=self.vector_db_path,
+                                             k=5, retrieval_mode=self.retrieval_mode)
+            print(f"🗃️  Retrieval cache: {config.RETRIEVAL_CACHE_SIZE} entries, "
+                  f"TTL {config.RETRIEVAL_CACHE_TTL_SECONDS}s")
+        
+        self.retriever = retriever
+        return retriever
+    
+    def create_base_retriever(self):
+        """Hybrid BM25 + vector search retriever, or vector search only"""
+        dense_retriever = self.vectorstore.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": 5}  # Retrieve top 5 most relevant chunks
+        )
+        
+        if self.retrieval_mode != "hybrid":
+            return dense_retriever
+        
+        if not self.chunks_file.exists():
+            print(f"⚠️  Chunks file not found at {self.chunks_file}, using vector search only")
+            print("💡 Run 02-01-rag-langchain-textSplitChunkOptimization.py to enable hybrid retrieval")
+            self.retrieval_mode = "dense"
+            return dense_retriever
+        
+        from config.settings import config
+        from src.retrieval.hybrid_retriever import HybridRetriever
+        
+        # Exact terms (NSG, SKU, port numbers) come from BM25, paraphrases from embeddings
+        return HybridRetriever.from_chunks_file(self.chunks_file, self.vectorstore, config, k=5)
+    
+    def create_answer_cache(self):
+        """Semantic answer cache in front of the chain (paraphrases skip generation)"""
+        from config.settings import config
+        
+        if config.SEMANTIC_CACHE_SIZE <= 0:
+            return None
+        
+        from src.generation.semantic_cache import SemanticAnswerCache
+        
+        self.answer_cache = SemanticAnswerCache(
+            self.embeddings,
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.SEMANTIC_CACHE_SIZE,
+            ttl_seconds=config.SEMANTIC_CACHE_TTL_SECONDS,
+            persist_dir=self.vector_db_path
+        )
+        print(f"🧠 Semantic answer cache: {config.SEMANTIC_CACHE_SIZE} entries, "
+              f"cosine >= {config.SEMANTIC_CACHE_THRESHOLD}")
+        return self.answer_cache
+    
     def create_rag_chain(self) -> bool:
         """Create RAG chain combining retrieval and generation"""
         try:
@@ -263,14 +433,13 @@ Answer:"""
             self.qa_chain = RetrievalQA.from_chain_type(
                 llm=self.llm,
                 chain_type="stuff",
-                retriever=self.vectorstore.as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": 5}  # Retrieve top 5 most relevant chunks
-                ),
+                retriever=self.create_retriever(),
                 return_source_documents=True,
                 chain_type_kwargs={"prompt": PROMPT}
             )
             
+            self.create_answer_cache()
+            
             print("✅ RAG chain created successfully")
             return True
             
@@ -283,6 +452,23 @@ Answer:"""
         try:
             start_time = time.time()
             print(f"\n🔍 Processing query: {question}")
+            # Answer paraphrases of earlier questions from the semantic cache
+            query_embedding = None
+            if self.answer_cache is not None:
+                cached, query_embedding = self.answer_cache.lookup(question)
+                if cached is not None:
+                    processing_time = time.time() - start_time
+                    print(f"⚡ Semantic cache hit (similarity {cached['similarity']:.3f}): \"{cached['question']}\"")
+                    print(f"\n⏱️  Query processed in {processing_time:.2f} seconds")
+                    return {
+                        "question": question,
+                        "answer": cached["answer"],
+                        "source_documents": cached["source_documents"],
+                        "num_sources": len(cached["source_documents"]),
+                        "processing_time": processing_time,
+                        "cached": True
+                    }
+            
             print("💭 Searching documentation and generating response...")
             
             # Get response from RAG chain
@@ -303,12 +489,16 @@ Answer:"""
             
             print(f"\n⏱️  Query processed in {processing_time:.2f} seconds")
             
+            if self.answer_cache is not None:
+                self.answer_cache.store(question, response["result"], source_docs, embedding=query_embedding)
+            
             return {
                 "question": question,
                 "answer": response["result"],
                 "source_documents": source_docs,
                 "num_sources": len(source_docs),
-                "processing_time": processing_time
+                "processing_time": processing_time,
+                "cached": False
             }
             
         except Exception as e:
@@ -483,8 +673,19 @@ Answer:"""
             print(f"\n📊 System Information:")
             print(f"  Model: {self.model_name}")
             print(f"  Ollama Host: {self.ollama_host}")
-            print(f"  Vector Store: {self.vector_db_path}")
+            print(f"  Vector Store: {self.vector_db_path} ({self.vector_backend})")
             print(f"  Collection: {self.collection_name}")
+            print(f"  Retrieval: {self.retrieval_mode}")
+            if self.retriever is not None and hasattr(self.retriever, 'cache'):
+                cache_stats = self.retriever.cache.stats()
+                print(f"  Retrieval cache: {cache_stats['entries']}/{cache_stats['max_entries']} entries, "
+                      f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                      f"({cache_stats['hit_rate']*100:.0f}% hit rate)")
+            if self.answer_cache is not None:
+                cache_stats = self.answer_cache.stats()
+                print(f"  Answer cache: {cache_stats['entries']}/{cache_stats['max_entries']} entries, "
+                      f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                      f"({cache_stats['hit_rate']*100:.0f}% hit rate)")
             
             # Try to get model info
             try:
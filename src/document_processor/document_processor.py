@@ -4,13 +4,20 @@ Advanced PDF processing with quality assessment and structure analysis
 """
 
 import re
+import heapq
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 
 class ProcessingTier(Enum):
     """Processing tiers based on document quality"""
@@ -44,6 +51,99 @@ class QualityAssessment:
     priority_score: int
 
 
+@dataclass
+class ContentProfile:
+    """Single tokenization of a document's text shared by the quality scorers"""
+    word_count: int
+    term_counts: Dict[str, int]
+    single_letter_words: int
+    long_words: int
+    random_chars: int
+
+
+@dataclass
+class QueuedDocument:
+    """Document waiting in the processing queue"""
+    file_path: str
+    assessment: QualityAssessment
+
+
+class ProcessingQueue:
+    """Thread-safe, heap-ordered processing queue, highest priority_score first
+    
+    Documents with equal priority come out in the order they were pushed.
+    A producer (assess_directory) pushes and finally close()s the queue;
+    consumers in other threads use get()/consume(), which block until a
+    document is available or the queue is closed.
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._counter = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def push(self, file_path, assessment: QualityAssessment):
+        """Add an assessed document to the queue"""
+        with self._condition:
+            heapq.heappush(self._heap, (-assessment.priority_score, self._counter,
+                                        QueuedDocument(str(file_path), assessment)))
+            self._counter += 1
+            self._condition.notify()
+    
+    def pop(self) -> QueuedDocument:
+        """Remove and return the highest-priority document (without waiting)"""
+        with self._condition:
+            if not self._heap:
+                raise IndexError("pop from empty processing queue")
+            return heapq.heappop(self._heap)[2]
+    
+    def peek(self) -> Optional[QueuedDocument]:
+        """Return the highest-priority document without removing it"""
+        with self._condition:
+            return self._heap[0][2] if self._heap else None
+    
+    def close(self):
+        """Mark the producer as finished and wake every waiting consumer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[QueuedDocument]:
+        """Wait for the highest-priority document
+        
+        Returns None once the queue is closed and empty (or on timeout).
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._heap or self._closed, timeout)
+            return heapq.heappop(self._heap)[2] if self._heap else None
+    
+    def consume(self):
+        """Yield documents as they become available until the queue is closed and empty"""
+        while True:
+            document = self.get()
+            if document is None:
+                return
+            yield document
+    
+    def drain(self):
+        """Pop documents in priority order until the queue is empty (without waiting)"""
+        while True:
+            with self._condition:
+                if not self._heap:
+                    return
+                document = heapq.heappop(self._heap)[2]
+            yield document
+    
+    def __len__(self):
+        with self._condition:
+            return len(self._heap)
+
+
 class EnhancedPDFReader:
     """Enhanced PDF reader with metadata and structure analysis"""
     
@@ -71,40 +171,117 @@ class EnhancedPDFReader:
             # Extract page content with analysis
             pages_content = self._extract_pages_content(doc)
             
-            # Combine all text
-            full_text = "\n".join(page['text'] for page in pages_content)
-            
-            # Calculate content statistics
-            content_stats = self._calculate_content_statistics(full_text, pages_content)
-            
-            # Detect structure patterns
-            structure_hints = self._detect_structure_patterns(full_text)
-            
             doc.close()
             
-            # Calculate processing time
-            processing_time = (datetime.now() - start_time).total_seconds()
-            
-            self.logger.info(f"PDF processing complete: {len(pages_content)} pages, "
-                           f"{len(full_text)} chars in {processing_time:.2f}s")
-            
-            return {
-                'content': full_text,
-                'metadata': metadata,
-                'pages': pages_content,
-                'content_stats': content_stats,
-                'structure_hints': structure_hints,
-                'processing_info': {
-                    'processing_time_seconds': processing_time,
-                    'processed_at': datetime.now().isoformat(),
-                    'processor_version': '1.0'
-                }
-            }
+            return self._build_pdf_result(metadata, pages_content, start_time)
             
         except Exception as e:
             self.logger.error(f"Error processing PDF {pdf_path}: {e}")
             raise
     
+    def read_pdfs_parallel(self, pdf_paths, max_workers=None, pages_per_task=50):
+        """Read many PDFs over a process pool
+        
+        Documents up to ``pages_per_task`` pages are read whole by one worker.
+        Larger documents are split into page ranges that run in parallel and
+        are reassembled in page order before analysis. Results are returned in
+        input order with the same shape as ``read_pdf_with_metadata``; PDFs
+        that fail are logged and left out.
+        """
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            raise Exception("PyMuPDF (fitz) not installed. Run: pip install PyMuPDF")
+        
+        pdf_paths = [str(pdf_path) for pdf_path in pdf_paths]
+        results = [None] * len(pdf_paths)
+        self.logger.info(f"Processing {len(pdf_paths)} PDFs in parallel")
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            document_futures = {}
+            split_documents = {}
+            
+            # Schedule whole documents and page ranges
+            for index, pdf_path in enumerate(pdf_paths):
+                try:
+                    with fitz.open(pdf_path) as doc:
+                        page_count = len(doc)
+                        if page_count > pages_per_task:
+                            metadata = self._extract_document_metadata(pdf_path, doc)
+                except Exception as e:
+                    self.logger.error(f"Error opening PDF {pdf_path}: {e}")
+                    continue
+                
+                if page_count <= pages_per_task:
+                    future = executor.submit(_read_pdf_task, pdf_path, self.config)
+                    document_futures[future] = index
+                else:
+                    range_futures = [
+                        executor.submit(_extract_page_range_task, pdf_path, start,
+                                        min(start + pages_per_task, page_count))
+                        for start in range(0, page_count, pages_per_task)
+                    ]
+                    split_documents[index] = (metadata, range_futures, datetime.now())
+            
+            # Reassemble split documents in page order and analyze them in the pool
+            for index, (metadata, range_futures, start_time) in split_documents.items():
+                try:
+                    pages_content = [page for future in range_futures for page in future.result()]
+                except Exception as e:
+                    self.logger.error(f"Error processing PDF {pdf_paths[index]}: {e}")
+                    continue
+                future = executor.submit(_build_pdf_result_task, self.config, metadata,
+                                         pages_content, start_time)
+                document_futures[future] = index
+            
+            for future, index in document_futures.items():
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error processing PDF {pdf_paths[index]}: {e}")
+        
+        processed = [result for result in results if result is not None]
+        self.logger.info(f"Parallel processing complete: {len(processed)}/{len(pdf_paths)} PDFs")
+        return processed
+    
+    def _build_pdf_result(self, metadata, pages_content, start_time):
+        """Combine page content and run document-level analysis"""
+        # Combine all text
+        full_text = "\n".join(page['text'] for page in pages_content)
+        
+        # Calculate content statistics
+        content_stats = self._calculate_content_statistics(full_text, pages_content)
+        
+        # Detect structure patterns
+        structure_hints = self._detect_structure_patterns(full_text)
+        
+        # Calculate processing time
+        processing_time = (datetime.now() - start_time).total_seconds()
+        
+        self.logger.info(f"PDF processing complete: {len(pages_content)} pages, "
+                       f"{len(full_text)} chars in {processing_time:.2f}s")
+        
+        return {
+            'content': full_text,
+            'metadata': metadata,
+            'pages': pages_content,
+            'content_stats': content_stats,
+            'structure_hints': structure_hints,
+            'processing_info': {
+                'processing_time_seconds': processing_time,
+                'processed_at': datetime.now().isoformat(),
+                'processor_version': '1.0'
+            }
+        }
+    
+    def stream_pdf_with_metadata(self, pdf_path):
+        """Read a PDF page by page with single-pass, incremental analysis
+        
+        Returns a StreamingPDFDocument: iterate it to receive pages, then call
+        summary() for metadata and statistics.
+        """
+        return StreamingPDFDocument(self, pdf_path)
+    
     def _extract_document_metadata(self, pdf_path, doc):
         """Extract document and file metadata"""
         pdf_path = Path(pdf_path)
@@ -135,31 +312,7 @@ class EnhancedPDFReader:
         pages = []
         
         for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
-            
-            # Calculate page statistics
-            char_count = len(page_text)
-            word_count = len(page_text.split())
-            line_count = len(page_text.splitlines())
-            
-            # Calculate content density
-            page_rect = page.rect
-            page_area = page_rect.width * page_rect.height
-            char_density = char_count / page_area if page_area > 0 else 0
-            
-            page_info = {
-                'page_number': page_num + 1,
-                'text': page_text,
-                'char_count': char_count,
-                'word_count': word_count,
-                'line_count': line_count,
-                'page_width': page_rect.width,
-                'page_height': page_rect.height,
-                'char_density': char_density
-            }
-            
-            pages.append(page_info)
+            pages.append(_analyze_page(doc[page_num], page_num))
             
             # Progress logging
             if (page_num + 1) % 10 == 0 or page_num == 0:
@@ -169,7 +322,257 @@ class EnhancedPDFReader:
     
     def _calculate_content_statistics(self, full_text, pages_content):
         """Calculate comprehensive content statistics"""
-        if not full_text.strip():
+        statistics = ContentStatisticsAccumulator()
+        statistics.add_text(full_text)
+        for page in pages_content:
+            statistics.add_page_stats(page)
+        return statistics.result()
+    
+    def _detect_structure_patterns(self, text):
+        """Detect document structure patterns"""
+        patterns = StructurePatternAccumulator()
+        patterns.add_text(text)
+        return patterns.result()
+    
+    def _estimate_readability(self, text):
+        """Estimate readability score (simplified Flesch Reading Ease)"""
+        statistics = ContentStatisticsAccumulator()
+        statistics.add_text(text)
+        return statistics.readability()
+
+
+class StreamingPDFDocument:
+    """Page-by-page PDF reader that builds all statistics in a single pass
+    
+    Iterating yields one page dict (including its text) at a time while the
+    content and structure accumulators are updated, so only the current page
+    is held in memory. The full document text is never built. There is a
+    single underlying page stream: iterating again resumes where the
+    previous loop stopped.
+    """
+    
+    def __init__(self, reader, pdf_path):
+        self.reader = reader
+        self.pdf_path = pdf_path
+        self.metadata = None
+        self.page_summaries = []
+        self.content_statistics = ContentStatisticsAccumulator()
+        self.structure_patterns = StructurePatternAccumulator()
+        self._start_time = None
+        self._completed = False
+        self._pages = None
+    
+    def __iter__(self):
+        if self._completed:
+            raise RuntimeError(f"PDF stream already consumed: {self.pdf_path}")
+        if self._pages is None:
+            self._pages = self._read_pages()
+        return self._pages
+    
+    def _read_pages(self):
+        """Generator over the pages, feeding the accumulators"""
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            raise Exception("PyMuPDF (fitz) not installed. Run: pip install PyMuPDF")
+        
+        self._start_time = datetime.now()
+        self.reader.logger.info(f"Streaming PDF: {Path(self.pdf_path).name}")
+        
+        with fitz.open(self.pdf_path) as doc:
+            self.metadata = self.reader._extract_document_metadata(self.pdf_path, doc)
+            
+            for page_num in range(len(doc)):
+                page_info = _analyze_page(doc[page_num], page_num)
+                self._add_page(page_info)
+                yield page_info
+                
+                # Progress logging
+                if (page_num + 1) % 10 == 0 or page_num == 0:
+                    self.reader.logger.debug(f"Streamed page {page_num + 1}/{len(doc)}")
+        
+        self._completed = True
+    
+    def _add_page(self, page_info):
+        """Update accumulators with one page"""
+        # Pages are joined by newlines, exactly like the full-text reader
+        if self.page_summaries:
+            self.content_statistics.add_text("\n")
+        self.content_statistics.add_text(page_info['text'])
+        self.content_statistics.add_page_stats(page_info)
+        self.structure_patterns.add_text(page_info['text'])
+        
+        self.page_summaries.append({key: value for key, value in page_info.items() if key != 'text'})
+    
+    def summary(self):
+        """Return the read_pdf_with_metadata result shape without the text
+        
+        Pages not yet consumed are read first (continuing the same stream,
+        so no page is counted twice). 'content' is omitted and
+        'pages' holds per-page statistics without page text.
+        """
+        if not self._completed:
+            for _ in self:
+                pass
+        
+        processing_time = (datetime.now() - self._start_time).total_seconds()
+        
+        self.reader.logger.info(f"PDF streaming complete: {len(self.page_summaries)} pages, "
+                              f"{self.content_statistics.total_chars} chars in {processing_time:.2f}s")
+        
+        return {
+            'metadata': self.metadata,
+            'pages': self.page_summaries,
+            'content_stats': self.content_statistics.result(),
+            'structure_hints': self.structure_patterns.result(),
+            'processing_info': {
+                'processing_time_seconds': processing_time,
+                'processed_at': datetime.now().isoformat(),
+                'processor_version': '1.0'
+            }
+        }
+
+
+class ContentStatisticsAccumulator:
+    """Incremental content statistics and readability counters
+    
+    Each piece of text is counted in one fused pass: character classes come
+    from a NumPy codepoint histogram, and word, vocabulary and syllable counts
+    from a single tokenization of the lowercased text. Text may be added in
+    several pieces as long as pieces are split on whitespace (e.g. pages
+    joined by newlines); the result equals computing the statistics over the
+    concatenated text.
+    """
+    
+    SENTENCE = re.compile(r'[^.!?\s][^.!?]*')
+    SENTENCE_TERMINATORS = '.!?'
+    PUNCTUATION = '.,!?;:'
+    
+    # Codepoint -> (alphabetic, numeric, punctuation, whitespace), shared across instances
+    _char_classes = {}
+    
+    def __init__(self):
+        # Character and word counters
+        self.total_chars = 0
+        self.total_words = 0
+        self.unique_words = set()
+        self.alphabetic_chars = 0
+        self.numeric_chars = 0
+        self.punctuation_chars = 0
+        self.whitespace_chars = 0
+        
+        # Readability counters
+        self.total_syllables = 0
+        self.sentence_count = 0
+        self._open_sentence = False
+        
+        # Page-level aggregations
+        self.page_count = 0
+        self.page_chars_total = 0
+        self.page_words_total = 0
+        self.page_density_total = 0
+        self.min_page_chars = None
+        self.max_page_chars = None
+    
+    def add_text(self, text):
+        """Update text counters with the next piece of the document"""
+        if not text:
+            return
+        self.total_chars += len(text)
+        
+        self._count_character_classes(text)
+        self._count_words(text)
+        self._count_sentences(text)
+    
+    def _count_character_classes(self, text):
+        """Character type distribution from a codepoint histogram"""
+        codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+        histogram = np.bincount(codepoints)
+        present = np.flatnonzero(histogram)
+        
+        # Classify each distinct codepoint once and weight it by its count
+        flags = np.array([self._classify_char(codepoint) for codepoint in present.tolist()], dtype=np.int64)
+        alphabetic, numeric, punctuation, whitespace = (histogram[present] @ flags).tolist()
+        
+        self.alphabetic_chars += alphabetic
+        self.numeric_chars += numeric
+        self.punctuation_chars += punctuation
+        self.whitespace_chars += whitespace
+    
+    @classmethod
+    def _classify_char(cls, codepoint):
+        """Return the character class flags for one codepoint"""
+        flags = cls._char_classes.get(codepoint)
+        if flags is None:
+            char = chr(codepoint)
+            flags = (char.isalpha(), char.isdigit(), char in cls.PUNCTUATION, char.isspace())
+            cls._char_classes[codepoint] = flags
+        return flags
+    
+    def _count_words(self, text):
+        """Word, vocabulary and syllable counts from one tokenization"""
+        # Lowercasing never adds or removes whitespace, so these are the
+        # same tokens as text.split(), already lowercased
+        word_counts = Counter(text.lower().split())
+        
+        self.total_words += sum(word_counts.values())
+        self.unique_words.update(word_counts)
+        self.total_syllables += sum(_count_syllables(word) * count for word, count in word_counts.items())
+    
+    def _count_sentences(self, text):
+        """Count non-empty sentence segments; the last one may continue in the next piece"""
+        terminator_positions = [text.find(terminator) for terminator in self.SENTENCE_TERMINATORS]
+        terminator_positions = [position for position in terminator_positions if position >= 0]
+        if not terminator_positions:
+            self._open_sentence = self._open_sentence or _has_content(text)
+            return
+        
+        first_terminator = min(terminator_positions)
+        last_terminator = max(text.rfind(terminator) for terminator in self.SENTENCE_TERMINATORS)
+        first_has_content = _has_content(text[:first_terminator])
+        last_has_content = _has_content(text[last_terminator + 1:])
+        
+        segments = sum(1 for _ in self.SENTENCE.finditer(text))
+        
+        # An open segment from the previous piece merges with this piece's first one
+        if self._open_sentence and not first_has_content:
+            segments += 1
+        if last_has_content:
+            segments -= 1
+        
+        self.sentence_count += segments
+        self._open_sentence = last_has_content
+    
+    def add_page_stats(self, page_info):
+        """Update page-level aggregations with one page"""
+        char_count = page_info['char_count']
+        
+        self.page_count += 1
+        self.page_chars_total += char_count
+        self.page_words_total += page_info['word_count']
+        self.page_density_total += page_info['char_density']
+        self.min_page_chars = char_count if self.min_page_chars is None else min(self.min_page_chars, char_count)
+        self.max_page_chars = char_count if self.max_page_chars is None else max(self.max_page_chars, char_count)
+    
+    def readability(self):
+        """Estimate readability score (simplified Flesch Reading Ease)"""
+        sentence_count = self.sentence_count + (1 if self._open_sentence else 0)
+        
+        if not sentence_count or not self.total_words:
+            return 0
+        
+        # Flesch Reading Ease approximation
+        avg_sentence_length = self.total_words / sentence_count
+        avg_syllables_per_word = self.total_syllables / self.total_words
+        
+        flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables_per_word)
+        
+        # Normalize to 0-100 range
+        return max(0, min(100, flesch_score))
+    
+    def result(self):
+        """Return the content_stats dictionary"""
+        if not self.total_words:
             return {
                 'total_characters': 0,
                 'total_words': 0,
@@ -178,59 +581,191 @@ class EnhancedPDFReader:
                 'readability_estimate': 0
             }
         
-        # Basic counts
-        total_chars = len(full_text)
-        words = full_text.split()
-        total_words = len(words)
-        unique_words = len(set(word.lower() for word in words))
-        
-        # Character type distribution
-        alphabetic_chars = sum(1 for c in full_text if c.isalpha())
-        numeric_chars = sum(1 for c in full_text if c.isdigit())
-        punctuation_chars = sum(1 for c in full_text if c in '.,!?;:')
-        whitespace_chars = sum(1 for c in full_text if c.isspace())
-        
-        # Page-level aggregations
-        page_chars = [page['char_count'] for page in pages_content]
-        page_words = [page['word_count'] for page in pages_content]
-        page_densities = [page['char_density'] for page in pages_content]
-        
-        # Content density metrics
-        avg_page_density = sum(page_densities) / len(page_densities) if page_densities else 0
-        content_density = total_words / total_chars if total_chars > 0 else 0
-        
-        # Readability estimate
-        readability = self._estimate_readability(full_text)
+        total_chars = self.total_chars
+        total_words = self.total_words
+        unique_words = len(self.unique_words)
+        page_count = self.page_count
         
         return {
             'total_characters': total_chars,
             'total_words': total_words,
             'unique_words': unique_words,
-            'alphabetic_chars': alphabetic_chars,
-            'numeric_chars': numeric_chars,
-            'punctuation_chars': punctuation_chars,
-            'whitespace_chars': whitespace_chars,
+            'alphabetic_chars': self.alphabetic_chars,
+            'numeric_chars': self.numeric_chars,
+            'punctuation_chars': self.punctuation_chars,
+            'whitespace_chars': self.whitespace_chars,
             'char_type_ratios': {
-                'alphabetic': alphabetic_chars / total_chars if total_chars > 0 else 0,
-                'numeric': numeric_chars / total_chars if total_chars > 0 else 0,
-                'punctuation': punctuation_chars / total_chars if total_chars > 0 else 0,
-                'whitespace': whitespace_chars / total_chars if total_chars > 0 else 0
+                'alphabetic': self.alphabetic_chars / total_chars,
+                'numeric': self.numeric_chars / total_chars,
+                'punctuation': self.punctuation_chars / total_chars,
+                'whitespace': self.whitespace_chars / total_chars
             },
             'page_stats': {
-                'avg_chars_per_page': sum(page_chars) / len(page_chars) if page_chars else 0,
-                'min_chars_per_page': min(page_chars) if page_chars else 0,
-                'max_chars_per_page': max(page_chars) if page_chars else 0,
-                'avg_words_per_page': sum(page_words) / len(page_words) if page_words else 0,
-                'avg_page_density': avg_page_density
+                'avg_chars_per_page': self.page_chars_total / page_count if page_count else 0,
+                'min_chars_per_page': self.min_page_chars if page_count else 0,
+                'max_chars_per_page': self.max_page_chars if page_count else 0,
+                'avg_words_per_page': self.page_words_total / page_count if page_count else 0,
+                'avg_page_density': self.page_density_total / page_count if page_count else 0
             },
-            'content_density': content_density,
-            'word_diversity_ratio': unique_words / total_words if total_words > 0 else 0,
-            'readability_estimate': readability
+            'content_density': total_words / total_chars,
+            'word_diversity_ratio': unique_words / total_words,
+            'readability_estimate': self.readability()
         }
+
+
+class StructurePatternAccumulator:
+    """Incremental document structure pattern counters
     
-    def _detect_structure_patterns(self, text):
-        """Detect document structure patterns"""
-        if not text.strip():
+    All patterns are compiled once and every line is classified in a single
+    scan. Matches that run across line breaks (a numbered or bullet marker
+    followed by a blank line, "Azure" at the end of a line, indentation
+    after blank lines) are tracked with carry state so the counts equal
+    matching the patterns over the whole text. Text is added page by page;
+    a match that would run across a page break is not counted.
+    """
+    
+    NUMBERED_SECTION = re.compile(r'\s*\d+\.\s+')
+    BULLET_POINT = re.compile(r'\s*[•\-\*]\s+')
+    URL = re.compile(r'https?://[^\s]+')
+    WORD = re.compile(r'\w+')
+    
+    # Azure patterns are case-insensitive; ASCII lines are lowercased and
+    # matched with the plain patterns, other lines use the IGNORECASE ones
+    AZURE_SERVICE = re.compile(r'\bazure\s+\w+')
+    AZURE_SERVICE_IGNORECASE = re.compile(r'\bazure\s+\w+', re.IGNORECASE)
+    AZURE_TRAILING = re.compile(r'\bazure\s*\Z')
+    AZURE_TRAILING_IGNORECASE = re.compile(r'\bazure\s*\Z', re.IGNORECASE)
+    AZURE_RESOURCE = re.compile(r'vnet|subnet|nsg|vm|load.?balancer|app.?service')
+    AZURE_RESOURCE_IGNORECASE = re.compile(r'vnet|subnet|nsg|vm|load.?balancer|app.?service', re.IGNORECASE)
+    
+    def __init__(self):
+        self.has_content = False
+        self.numbered_sections = 0
+        self.bullet_points = 0
+        self.all_caps_lines = 0
+        self.title_case_lines = 0
+        self.has_code_blocks = False
+        self.pipe_count = 0
+        self.has_tab_columns = False
+        self.url_count = 0
+        self.azure_services = 0
+        self.azure_resource_patterns = 0
+    
+    def add_text(self, text):
+        """Update structure counters with the next piece of the document"""
+        # Table indicators
+        self.pipe_count += text.count('|')
+        check_tab_columns = not self.has_tab_columns and text.count('\t') >= 3
+        
+        numbered_sections = bullet_points = all_caps_lines = title_case_lines = 0
+        url_count = azure_services = azure_resource_patterns = 0
+        has_content = self.has_content
+        has_code_blocks = self.has_code_blocks
+        
+        # Carry state for matches that continue onto the next line
+        numbered_carry = False
+        bullet_carry = False
+        azure_carry = False
+        blank_run = 0
+        
+        lines = text.split('\n')
+        last_line = len(lines) - 1
+        
+        for line_number, line in enumerate(lines):
+            has_newline = line_number < last_line
+            
+            if check_tab_columns and line.count('\t') >= 3:
+                self.has_tab_columns = True
+                check_tab_columns = False
+            
+            stripped = line.strip()
+            if not stripped:
+                # Whitespace-only lines extend any pending cross-line match
+                blank_run += len(line) + has_newline
+                continue
+            
+            has_content = True
+            indent = len(line) - len(line.lstrip())
+            first_char = line[indent]
+            starts_with_word = first_char.isalnum() or first_char == '_'
+            
+            # Heading pattern detection
+            if numbered_carry and indent:
+                numbered_carry = False
+            else:
+                numbered_carry = False
+                if first_char.isdecimal():
+                    match = self.NUMBERED_SECTION.match(line + '\n' if has_newline else line)
+                    if match:
+                        numbered_sections += 1
+                        numbered_carry = has_newline and match.end() == len(line) + 1
+            
+            if bullet_carry and indent:
+                bullet_carry = False
+            else:
+                bullet_carry = False
+                if first_char in '•-*':
+                    match = self.BULLET_POINT.match(line + '\n' if has_newline else line)
+                    if match:
+                        bullet_points += 1
+                        bullet_carry = has_newline and match.end() == len(line) + 1
+            
+            if len(stripped) > 3 and stripped.isupper():
+                all_caps_lines += 1
+            if len(stripped) > 10 and stripped.istitle():
+                title_case_lines += 1
+            
+            # Content indicators
+            if not has_code_blocks:
+                has_code_blocks = '```' in line or (blank_run + indent >= 4 and starts_with_word)
+            blank_run = 0
+            
+            if '://' in line:
+                url_count += len(self.URL.findall(line))
+            
+            # Azure-specific patterns
+            if line.isascii():
+                target = line.lower()
+                service_pattern, trailing_pattern = self.AZURE_SERVICE, self.AZURE_TRAILING
+                resource_pattern = self.AZURE_RESOURCE
+                may_mention_azure = 'azure' in target
+                may_mention_resource = ('net' in target or 'nsg' in target or 'vm' in target
+                                        or 'load' in target or 'app' in target)
+            else:
+                target = line
+                service_pattern, trailing_pattern = self.AZURE_SERVICE_IGNORECASE, self.AZURE_TRAILING_IGNORECASE
+                resource_pattern = self.AZURE_RESOURCE_IGNORECASE
+                may_mention_azure = may_mention_resource = True
+            
+            position = 0
+            if azure_carry and starts_with_word:
+                # "Azure" at the end of an earlier line takes this line's first word
+                azure_services += 1
+                position = self.WORD.match(line, indent).end()
+            azure_carry = False
+            
+            if may_mention_azure:
+                for match in service_pattern.finditer(target, position):
+                    azure_services += 1
+                    position = match.end()
+                azure_carry = has_newline and trailing_pattern.search(target, position) is not None
+            
+            if may_mention_resource:
+                azure_resource_patterns += len(resource_pattern.findall(target))
+        
+        self.has_content = has_content
+        self.has_code_blocks = has_code_blocks
+        self.numbered_sections += numbered_sections
+        self.bullet_points += bullet_points
+        self.all_caps_lines += all_caps_lines
+        self.title_case_lines += title_case_lines
+        self.url_count += url_count
+        self.azure_services += azure_services
+        self.azure_resource_patterns += azure_resource_patterns
+    
+    def result(self):
+        """Return the structure_hints dictionary"""
+        if not self.has_content:
             return {
                 'structure_confidence': 0,
                 'heading_patterns': {},
@@ -238,99 +773,39 @@ class EnhancedPDFReader:
                 'azure_patterns': {}
             }
         
-        lines = text.split('\n')
-        
-        # Heading pattern detection
-        numbered_sections = len(re.findall(r'^\s*\d+\.\s+', text, re.MULTILINE))
-        bullet_points = len(re.findall(r'^\s*[•\-\*]\s+', text, re.MULTILINE))
-        all_caps_lines = len([line for line in lines if line.strip() and line.strip().isupper() and len(line.strip()) > 3])
-        title_case_lines = len([line for line in lines if line.strip() and line.strip().istitle() and len(line.strip()) > 10])
-        
-        # Content indicators
-        has_code_blocks = bool(re.search(r'```|```\w+', text)) or bool(re.search(r'^\s{4,}\w+', text, re.MULTILINE))
-        has_tables = text.count('|') > 10 or bool(re.search(r'\t.*\t.*\t', text))
-        url_count = len(re.findall(r'https?://[^\s]+', text))
-        
-        # Azure-specific patterns
-        azure_services = len(re.findall(r'\bazure\s+\w+', text, re.IGNORECASE))
-        azure_resource_patterns = len(re.findall(r'(vnet|subnet|nsg|vm|load.?balancer|app.?service)', text, re.IGNORECASE))
+        has_tables = self.pipe_count > 10 or self.has_tab_columns
         
         # Calculate structure confidence
         structure_confidence = self._calculate_structure_confidence({
-            'numbered_sections': numbered_sections,
-            'bullet_points': bullet_points,
-            'all_caps_lines': all_caps_lines,
-            'has_code_blocks': has_code_blocks,
+            'numbered_sections': self.numbered_sections,
+            'bullet_points': self.bullet_points,
+            'all_caps_lines': self.all_caps_lines,
+            'has_code_blocks': self.has_code_blocks,
             'has_tables': has_tables
         })
         
         return {
             'structure_confidence': structure_confidence,
-            'estimated_sections': max(numbered_sections, all_caps_lines // 2),
+            'estimated_sections': max(self.numbered_sections, self.all_caps_lines // 2),
             'heading_patterns': {
-                'numbered_sections': numbered_sections,
-                'bullet_points': bullet_points,
-                'all_caps_lines': all_caps_lines,
-                'title_case_lines': title_case_lines
+                'numbered_sections': self.numbered_sections,
+                'bullet_points': self.bullet_points,
+                'all_caps_lines': self.all_caps_lines,
+                'title_case_lines': self.title_case_lines
             },
             'content_indicators': {
-                'has_code_blocks': has_code_blocks,
+                'has_code_blocks': self.has_code_blocks,
                 'has_tables': has_tables,
-                'has_urls': url_count,
-                'url_count': url_count
+                'has_urls': self.url_count,
+                'url_count': self.url_count
             },
             'azure_patterns': {
-                'azure_services': azure_services,
-                'azure_resources': azure_resource_patterns,
-                'total_azure_mentions': azure_services + azure_resource_patterns
+                'azure_services': self.azure_services,
+                'azure_resources': self.azure_resource_patterns,
+                'total_azure_mentions': self.azure_services + self.azure_resource_patterns
             }
         }
     
-    def _estimate_readability(self, text):
-        """Estimate readability score (simplified Flesch Reading Ease)"""
-        if not text.strip():
-            return 0
-        
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not sentences:
-            return 0
-        
-        words = text.split()
-        if not words:
-            return 0
-        
-        # Simple syllable estimation (rough approximation)
-        def count_syllables(word):
-            word = word.lower()
-            vowels = 'aeiouy'
-            syllable_count = 0
-            prev_was_vowel = False
-            
-            for char in word:
-                is_vowel = char in vowels
-                if is_vowel and not prev_was_vowel:
-                    syllable_count += 1
-                prev_was_vowel = is_vowel
-            
-            # Handle silent e
-            if word.endswith('e') and syllable_count > 1:
-                syllable_count -= 1
-            
-            return max(1, syllable_count)
-        
-        total_syllables = sum(count_syllables(word) for word in words)
-        
-        # Flesch Reading Ease approximation
-        avg_sentence_length = len(words) / len(sentences)
-        avg_syllables_per_word = total_syllables / len(words)
-        
-        flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables_per_word)
-        
-        # Normalize to 0-100 range
-        return max(0, min(100, flesch_score))
-    
     def _calculate_structure_confidence(self, indicators):
         """Calculate confidence in document structure"""
         confidence = 0.0
@@ -357,9 +832,103 @@ class EnhancedPDFReader:
         return min(1.0, confidence)
 
 
+def _has_content(text):
+    """True if text has any non-whitespace character"""
+    return bool(text) and not text.isspace()
+
+
+@lru_cache(maxsize=65536)
+def _count_syllables(word):
+    """Simple syllable estimation (rough approximation)"""
+    word = word.lower()
+    vowels = 'aeiouy'
+    syllable_count = 0
+    prev_was_vowel = False
+    
+    for char in word:
+        is_vowel = char in vowels
+        if is_vowel and not prev_was_vowel:
+            syllable_count += 1
+        prev_was_vowel = is_vowel
+    
+    # Handle silent e
+    if word.endswith('e') and syllable_count > 1:
+        syllable_count -= 1
+    
+    return max(1, syllable_count)
+
+
+def _analyze_page(page, page_num):
+    """Extract text and statistics from a single PyMuPDF page"""
+    page_text = page.get_text()
+    
+    # Calculate page statistics
+    char_count = len(page_text)
+    word_count = len(page_text.split())
+    line_count = len(page_text.splitlines())
+    
+    # Calculate content density
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    char_density = char_count / page_area if page_area > 0 else 0
+    
+    return {
+        'page_number': page_num + 1,
+        'text': page_text,
+        'char_count': char_count,
+        'word_count': word_count,
+        'line_count': line_count,
+        'page_width': page_rect.width,
+        'page_height': page_rect.height,
+        'char_density': char_density
+    }
+
+
+# Process pool tasks (module level so they can be pickled)
+
+def _read_pdf_task(pdf_path, config):
+    """Read and analyze a whole PDF in a worker process"""
+    return EnhancedPDFReader(config).read_pdf_with_metadata(pdf_path)
+
+
+def _extract_page_range_task(pdf_path, start, end):
+    """Extract pages [start, end) of a PDF in a worker process"""
+    import fitz  # PyMuPDF
+    
+    with fitz.open(pdf_path) as doc:
+        return [_analyze_page(doc[page_num], page_num) for page_num in range(start, end)]
+
+
+def _build_pdf_result_task(config, metadata, pages_content, start_time):
+    """Run document-level analysis for reassembled pages in a worker process"""
+    return EnhancedPDFReader(config)._build_pdf_result(metadata, pages_content, start_time)
+
+
+def _assess_pdf_task(pdf_path, config):
+    """Read and assess a PDF in a worker process"""
+    pdf_data = EnhancedPDFReader(config).read_pdf_with_metadata(pdf_path)
+    return DocumentQualityAssessor(config).assess_document_quality(pdf_data)
+
+
 class DocumentQualityAssessor:
     """Production-ready document quality assessment system"""
     
+    # Technical terminology density
+    TECHNICAL_TERMS = [
+        'configuration', 'deployment', 'management', 'security',
+        'network', 'virtual', 'resource', 'service', 'endpoint',
+        'policy', 'rule', 'group', 'account', 'subscription'
+    ]
+    
+    # Content value indicators
+    VALUE_KEYWORDS = [
+        'guide', 'tutorial', 'documentation', 'best practices',
+        'architecture', 'deployment', 'configuration', 'troubleshooting'
+    ]
+    
+    # Characters outside normal prose (common OCR artifacts)
+    RANDOM_CHARS = re.compile(r'[^\w\s\.\,\!\?\-\(\)\:\;]')
+    
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
@@ -389,12 +958,15 @@ class DocumentQualityAssessor:
         
         self.logger.info(f"Assessing quality for: {pdf_data['metadata']['filename']}")
         
+        # Tokenize once for all text-based scorers
+        profile = self._build_content_profile(pdf_data['content'])
+        
         # Individual quality components
         structure_quality = self._assess_structure_quality(pdf_data)
         content_quality = self._assess_content_quality(pdf_data)
-        technical_quality = self._assess_technical_quality(pdf_data)
-        ocr_quality = self._assess_ocr_quality(pdf_data)
-        business_value = self._assess_business_value(pdf_data)
+        technical_quality = self._assess_technical_quality(pdf_data, profile)
+        ocr_quality = self._assess_ocr_quality(pdf_data, profile)
+        business_value = self._assess_business_value(pdf_data, profile)
         
         # Confidence factors for transparency
         confidence_factors = {
@@ -438,6 +1010,85 @@ class DocumentQualityAssessor:
         self.logger.info(f"Quality assessment complete: {overall_score:.2f} -> {processing_tier.value}")
         return assessment
     
+    def assess_documents_as_completed(self, pdf_paths, max_workers=None):
+        """Read and assess PDFs over a process pool
+        
+        Yields (file_path, QualityAssessment) pairs as soon as each document
+        is assessed, so callers can start on early results. PDFs that fail
+        are logged and skipped.
+        """
+        pdf_paths = [str(pdf_path) for pdf_path in pdf_paths]
+        self.logger.info(f"Assessing {len(pdf_paths)} documents in parallel")
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_assess_pdf_task, pdf_path, self.config): pdf_path
+                       for pdf_path in pdf_paths}
+            
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    self.logger.error(f"Error assessing {futures[future]}: {e}")
+    
+    def assess_directory(self, directory=None, max_workers=None, queue=None,
+                         background=False) -> ProcessingQueue:
+        """Assess every PDF under a directory and build the processing queue
+        
+        Defaults to config.PDF_FOLDER. Documents that should be processed are
+        pushed onto ``queue`` (a new ProcessingQueue if not given) as their
+        assessments complete, and the queue is closed when all are done.
+        
+        By default this blocks until the whole batch is assessed. With
+        background=True the assessment runs in a daemon thread and the queue
+        is returned immediately; consume() it to process documents while the
+        rest are still being assessed.
+        """
+        queue = ProcessingQueue() if queue is None else queue
+        
+        if background:
+            thread = threading.Thread(target=self.assess_directory,
+                                      args=(directory, max_workers, queue),
+                                      name="assess_directory", daemon=True)
+            thread.start()
+            return queue
+        
+        directory = Path(directory or self.config.PDF_FOLDER)
+        pdf_paths = sorted(directory.rglob("*.pdf"))
+        skipped = 0
+        queued = 0
+        
+        try:
+            for pdf_path, assessment in self.assess_documents_as_completed(pdf_paths, max_workers):
+                if assessment.should_process:
+                    queue.push(pdf_path, assessment)
+                    queued += 1
+                else:
+                    skipped += 1
+        finally:
+            queue.close()
+        
+        self.logger.info(f"Directory assessment complete: {queued} queued, {skipped} not worth processing")
+        return queue
+    
+    def _build_content_profile(self, content: str) -> ContentProfile:
+        """Lowercase and split the content once and count every scoring keyword
+        
+        Keywords are counted as substrings of the shared lowercase copy;
+        per-term str.count is faster here than a combined regex scan.
+        """
+        lowered = content.lower()
+        words = content.split()
+        
+        scoring_terms = dict.fromkeys(self.TECHNICAL_TERMS + self.VALUE_KEYWORDS)
+        
+        return ContentProfile(
+            word_count=len(words),
+            term_counts={term: lowered.count(term) for term in scoring_terms},
+            single_letter_words=sum(1 for word in words if len(word) == 1 and word.isalpha()),
+            long_words=sum(1 for word in words if len(word) > 20),
+            random_chars=len(self.RANDOM_CHARS.findall(content))
+        )
+    
     def _assess_structure_quality(self, pdf_data: Dict) -> float:
         """Assess document structure quality"""
         structure_hints = pdf_data['structure_hints']
@@ -498,22 +1149,17 @@ class DocumentQualityAssessor:
         self.logger.debug(f"Content quality: {quality_score:.2f} (diversity: {word_diversity:.2f}, density: {content_density:.2f})")
         return min(1.0, quality_score)
     
-    def _assess_technical_quality(self, pdf_data: Dict) -> float:
+    def _assess_technical_quality(self, pdf_data: Dict, profile: Optional[ContentProfile] = None) -> float:
         """Assess technical content quality for Azure documents"""
         structure_hints = pdf_data['structure_hints']
-        content = pdf_data['content'].lower()
+        profile = profile or self._build_content_profile(pdf_data['content'])
         
         # Azure-specific quality indicators
         azure_mentions = structure_hints['azure_patterns']['azure_services']
         
         # Technical terminology density
-        technical_terms = [
-            'configuration', 'deployment', 'management', 'security',
-            'network', 'virtual', 'resource', 'service', 'endpoint',
-            'policy', 'rule', 'group', 'account', 'subscription'
-        ]
-        
-        technical_density = sum(content.count(term) for term in technical_terms) / max(1, len(content.split()))
+        technical_density = (sum(profile.term_counts[term] for term in self.TECHNICAL_TERMS)
+                             / max(1, profile.word_count))
         
         # Code and configuration indicators
         has_code = structure_hints['content_indicators']['has_code_blocks']
@@ -541,28 +1187,25 @@ class DocumentQualityAssessor:
         self.logger.debug(f"Technical quality: {technical_score:.2f} (Azure mentions: {azure_mentions}, tech density: {technical_density:.3f})")
         return min(1.0, technical_score)
     
-    def _assess_ocr_quality(self, pdf_data: Dict) -> float:
+    def _assess_ocr_quality(self, pdf_data: Dict, profile: Optional[ContentProfile] = None) -> float:
         """Assess OCR quality and text extraction reliability"""
         content = pdf_data['content']
+        profile = profile or self._build_content_profile(content)
         
-        if not content.strip():
+        if not profile.word_count:
             return 0.0
         
         # OCR quality indicators
         total_chars = len(content)
         
         # Check for OCR artifacts
-        random_chars = len(re.findall(r'[^\w\s\.\,\!\?\-\(\)\:\;]', content))
-        random_char_ratio = random_chars / max(1, total_chars)
+        random_char_ratio = profile.random_chars / max(1, total_chars)
         
         # Check for broken words (common OCR issue)
-        words = content.split()
-        short_fragments = len([w for w in words if len(w) == 1 and w.isalpha()])
-        fragment_ratio = short_fragments / max(1, len(words))
+        fragment_ratio = profile.single_letter_words / max(1, profile.word_count)
         
         # Check for missing spaces (words run together)
-        long_words = len([w for w in words if len(w) > 20])
-        long_word_ratio = long_words / max(1, len(words))
+        long_word_ratio = profile.long_words / max(1, profile.word_count)
         
         # Calculate OCR quality score
         ocr_score = 1.0
@@ -575,22 +1218,18 @@ class DocumentQualityAssessor:
         self.logger.debug(f"OCR quality: {ocr_score:.2f} (random chars: {random_char_ratio:.3f}, fragments: {fragment_ratio:.3f})")
         return ocr_score
     
-    def _assess_business_value(self, pdf_data: Dict) -> float:
+    def _assess_business_value(self, pdf_data: Dict, profile: Optional[ContentProfile] = None) -> float:
         """Assess business value and priority of the document"""
-        content = pdf_data['content'].lower()
         metadata = pdf_data['metadata']
+        profile = profile or self._build_content_profile(pdf_data['content'])
         
         # Document freshness
         file_age_days = 0  # Could calculate from file metadata
         freshness_score = max(0.5, 1.0 - (file_age_days / 365))  # Decay over a year
         
         # Content value indicators
-        value_keywords = [
-            'guide', 'tutorial', 'documentation', 'best practices',
-            'architecture', 'deployment', 'configuration', 'troubleshooting'
-        ]
-        
-        value_score = sum(content.count(keyword) for keyword in value_keywords) / max(1, len(content.split()))
+        value_score = (sum(profile.term_counts[keyword] for keyword in self.VALUE_KEYWORDS)
+                       / max(1, profile.word_count))
         value_score = min(1.0, value_score * 100)  # Scale up
         
         # Document size (comprehensive content is valuable)
@@ -701,8 +1340,9 @@ class DocumentQualityAssessor:
     def _calculate_priority_score(self, overall_score: float, business_value: float, estimated_cost: float) -> int:
         """Calculate priority score for processing queue (0-100)"""
         # Higher score = higher priority
-        priority = (overall_score * 40 + business_value * 40 + (10 / max(1, estimated_cost)) * 20)
-        return min(100, int(priority * 100))
+        cost_efficiency = 1 / max(1, estimated_cost)
+        priority = overall_score * 40 + business_value * 40 + cost_efficiency * 20
+        return max(0, min(100, int(priority)))
     
     def _is_technical_document(self, pdf_data: Dict) -> bool:
         """Detect if document is technical in nature"""
@@ -0,0 +1,145 @@
+"""
+Semantic Answer Cache for Azure RAG
+Serves answers to paraphrased questions by matching query embeddings
+against previously answered questions
+"""
+
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.retrieval.retrieval_cache import BuildMarkerWatcher
+
+
+class SemanticAnswerCache:
+    """Fixed-capacity cache of (query embedding, answer, sources)
+
+    Embeddings are L2-normalized rows of one preallocated float32 matrix, so
+    a lookup is a single matrix-vector product; a hit is the most similar
+    stored question with cosine similarity >= threshold. When full, the
+    least recently used entry is overwritten. Entries expire after
+    ttl_seconds and are all dropped when the vector store is rebuilt.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, max_entries: int = 512,
+                 ttl_seconds: float = 86400, persist_dir=None):
+        """
+        Args:
+            embeddings: LangChain Embeddings used to embed questions
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Capacity (rows of the embedding matrix)
+            ttl_seconds: Lifetime of an entry
+            persist_dir: Vector store directory whose build marker invalidates the cache
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.build_watcher = BuildMarkerWatcher(persist_dir) if persist_dir is not None else None
+        self.build_id = None
+
+        self._matrix = None                      # (max_entries, dim) normalized embeddings
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._last_used = np.zeros(max_entries)  # monotonic time, for LRU eviction
+        self._expires_at = np.zeros(max_entries)
+        self._entries: List[Optional[Dict]] = [None] * max_entries
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        """Normalized float32 embedding of a question"""
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_build(self):
+        """Drop every entry if the vector store was rebuilt"""
+        if self.build_watcher is None:
+            return
+        build_id = self.build_watcher.current_build()
+        if build_id != self.build_id:
+            self._valid[:] = False
+            self._entries = [None] * self.max_entries
+            self.build_id = build_id
+
+    def lookup(self, question: str) -> Tuple[Optional[Dict[str, Any]], np.ndarray]:
+        """Find the most similar stored question
+
+        Returns (entry, embedding): entry holds 'answer', 'source_documents',
+        the original 'question' and the 'similarity', or is None on a miss;
+        pass the embedding to store() to avoid embedding the question twice.
+        """
+        embedding = self._embed(question)
+
+        with self._lock:
+            self._check_build()
+            now = time.monotonic()
+
+            # Expire stale entries before matching
+            expired = self._valid & (self._expires_at < now)
+            if expired.any():
+                self._valid[expired] = False
+
+            if self._matrix is not None and self._valid.any():
+                similarities = self._matrix @ embedding
+                similarities[~self._valid] = -np.inf
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self._last_used[best] = now
+                    self.hits += 1
+                    entry = self._entries[best]
+                    return {**entry, 'similarity': float(similarities[best])}, embedding
+
+            self.misses += 1
+            return None, embedding
+
+    def store(self, question: str, answer: str, source_documents: List[Dict],
+              embedding: Optional[np.ndarray] = None):
+        """Add an answered question, evicting the least recently used entry if full"""
+        if embedding is None:
+            embedding = self._embed(question)
+
+        with self._lock:
+            # A rebuild since the last lookup must not leave stale entries next to this one
+            self._check_build()
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+            free_slots = np.flatnonzero(~self._valid)
+            if len(free_slots):
+                slot = int(free_slots[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            now = time.monotonic()
+            self._matrix[slot] = embedding
+            self._valid[slot] = True
+            self._last_used[slot] = now
+            self._expires_at[slot] = now + self.ttl_seconds
+            self._entries[slot] = {
+                'question': question,
+                'answer': answer,
+                'source_documents': source_documents
+            }
+
+    def __len__(self):
+        return int(self._valid.sum())
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,126 @@
+"""
+Hybrid Retrieval for Azure RAG
+Runs BM25 keyword search and dense vector search side by side and fuses
+the two rankings with reciprocal rank fusion (RRF)
+"""
+
+import io
+import pickle
+import contextlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from src.utils.foundation import BasicTextSearcher
+
+
+def load_chunk_documents(chunks_file) -> List[Document]:
+    """Load the Documents written by the 02-01 chunking script
+
+    Reads every pickle frame (one per source file) and also accepts the
+    older single-list files.
+    """
+    documents = []
+    with open(chunks_file, "rb") as f:
+        while True:
+            try:
+                documents.extend(pickle.load(f))
+            except EOFError:
+                break
+    return documents
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], rrf_k: int = 60) -> List[tuple]:
+    """Fuse ranked Document lists: score(d) = sum of 1 / (rrf_k + rank)
+
+    Documents are matched across lists by (source, content). Returns
+    (document, score) pairs, best first, ties in order of first appearance.
+    """
+    fused: Dict[tuple, list] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, 1):
+            key = (document.metadata.get('source'), document.page_content)
+            entry = fused.get(key)
+            if entry is None:
+                fused[key] = [document, 1.0 / (rrf_k + rank)]
+            else:
+                entry[1] += 1.0 / (rrf_k + rank)
+
+    # sorted() is stable, so equal scores keep first-appearance order
+    return sorted(((document, score) for document, score in fused.values()),
+                  key=lambda pair: pair[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """LangChain retriever fusing BM25 (BasicTextSearcher) and dense vector search
+
+    Both searches fetch candidate_k results concurrently, the dense one on
+    a single worker thread that lives as long as the retriever (call
+    close() to stop it); the fused top k are returned with their RRF score
+    in metadata['rrf_score'].
+    """
+
+    keyword_searcher: Any
+    vectorstore: Any
+    k: int = 5
+    candidate_k: int = 20
+    rrf_k: int = 60
+
+    _executor: ThreadPoolExecutor = PrivateAttr(
+        default_factory=lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="hybrid-dense"))
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], vectorstore, config, **kwargs) -> "HybridRetriever":
+        """Build the BM25 index over chunk Documents and pair it with a vector store"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            searcher = BasicTextSearcher(config)
+            searcher.add_chunks([{
+                'content': document.page_content,
+                'chunk_id': chunk_id,
+                'source': document.metadata.get('source', 'Unknown'),
+                'char_count': len(document.page_content),
+                'word_count': len(document.page_content.split()),
+                'metadata': document.metadata
+            } for chunk_id, document in enumerate(documents)])
+
+        print(f"🔀 Hybrid retriever: BM25 index over {len(documents)} chunks, "
+              f"{len(searcher.search_index):,} terms")
+        return cls(keyword_searcher=searcher, vectorstore=vectorstore, **kwargs)
+
+    @classmethod
+    def from_chunks_file(cls, chunks_file, vectorstore, config, **kwargs) -> "HybridRetriever":
+        """Build from the documents_chunks.pkl written by 02-01"""
+        return cls.from_documents(load_chunk_documents(Path(chunks_file)), vectorstore, config, **kwargs)
+
+    def _keyword_search(self, query: str) -> List[Document]:
+        """BM25 ranking as Documents"""
+        results = self.keyword_searcher.search(query, max_results=self.candidate_k, verbose=False)
+        return [Document(page_content=result['chunk']['content'],
+                         metadata=result['chunk'].get('metadata', {'source': result['chunk']['source']}))
+                for result in results]
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: Optional[CallbackManagerForRetrieverRun] = None) -> List[Document]:
+        """Run both searches concurrently and fuse them with RRF"""
+        # Dense search (query embedding + ANN lookup) runs in the background
+        dense_future = self._executor.submit(self.vectorstore.similarity_search, query, k=self.candidate_k)
+        keyword_results = self._keyword_search(query)
+        dense_results = dense_future.result()
+
+        fused = reciprocal_rank_fusion([keyword_results, dense_results], rrf_k=self.rrf_k)
+
+        documents = []
+        for document, score in fused[:self.k]:
+            metadata = dict(document.metadata)
+            metadata['rrf_score'] = score
+            documents.append(Document(page_content=document.page_content, metadata=metadata))
+        return documents
+
+    def close(self):
+        """Stop the dense-search worker thread"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,185 @@
+"""
+Retrieval Result Cache for Azure RAG
+Bounded LRU + TTL cache of retrieved documents, invalidated whenever the
+vector store is rebuilt
+"""
+
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Written into the vector store directory by 03-01 after every (re)build
+BUILD_MARKER_NAME = "build_marker.json"
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used in cache keys"""
+    return ' '.join(query.lower().split())
+
+
+def write_build_marker(persist_dir, **build_info) -> str:
+    """Record a new vector store build; returns its build id"""
+    build_id = uuid.uuid4().hex
+    marker = {'build_id': build_id, 'built_at': datetime.now().isoformat(), **build_info}
+    with open(Path(persist_dir) / BUILD_MARKER_NAME, 'w', encoding='utf-8') as f:
+        json.dump(marker, f, indent=2)
+    return build_id
+
+
+def read_build_marker(persist_dir) -> Dict[str, Any]:
+    """The build marker of a vector store directory ({} if missing or unreadable)"""
+    try:
+        with open(Path(persist_dir) / BUILD_MARKER_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class BuildMarkerWatcher:
+    """Cheap change detection for the vector store build marker
+
+    Only stats the marker file per check and re-reads it when its mtime or
+    size changes.
+    """
+
+    def __init__(self, persist_dir):
+        self.marker_file = Path(persist_dir) / BUILD_MARKER_NAME
+        self._signature = None
+        self.build_id = None
+
+    def current_build(self) -> Optional[str]:
+        """Build id of the vector store on disk (None if no marker)"""
+        try:
+            stat = self.marker_file.stat()
+        except FileNotFoundError:
+            self._signature = None
+            self.build_id = None
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            try:
+                with open(self.marker_file, 'r', encoding='utf-8') as f:
+                    self.build_id = json.load(f).get('build_id')
+            except (OSError, ValueError):
+                self.build_id = str(signature)
+            self._signature = signature
+        return self.build_id
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+
+class CachedRetriever(BaseRetriever):
+    """LangChain retriever that serves repeated queries from a RetrievalCache
+
+    Keys combine the normalized query, cache_params (k, retrieval mode, ...)
+    and the vector store build id, and the cache is cleared as soon as the
+    build marker changes, so a rebuilt store never serves stale results.
+    """
+
+    retriever: Any
+    cache: Any
+    cache_params: Dict[str, Any] = {}
+    build_watcher: Any = None
+    build_id: Optional[str] = None
+
+    @classmethod
+    def wrap(cls, retriever, config=None, persist_dir=None, **cache_params) -> "CachedRetriever":
+        """Wrap a retriever with a cache sized from config"""
+        cache = RetrievalCache(max_entries=getattr(config, 'RETRIEVAL_CACHE_SIZE', 256),
+                               ttl_seconds=getattr(config, 'RETRIEVAL_CACHE_TTL_SECONDS', 3600))
+        watcher = BuildMarkerWatcher(persist_dir) if persist_dir is not None else None
+        return cls(retriever=retriever, cache=cache, cache_params=cache_params, build_watcher=watcher)
+
+    def _check_build(self):
+        """Clear the cache if the vector store was rebuilt since the last call"""
+        if self.build_watcher is None:
+            return
+        build_id = self.build_watcher.current_build()
+        if build_id != self.build_id:
+            if self.build_id is not None:
+                print("🔄 Vector store rebuilt, clearing retrieval cache")
+            self.cache.clear()
+            self.build_id = build_id
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: Optional[CallbackManagerForRetrieverRun] = None) -> List[Document]:
+        """Cached documents for the query, retrieving on a miss"""
+        self._check_build()
+        key = (normalize_query(query), tuple(sorted(self.cache_params.items())), self.build_id)
+
+        documents = self.cache.get(key)
+        if documents is None:
+            child_config = {"callbacks": run_manager.get_child()} if run_manager else None
+            documents = self.retriever.invoke(query, config=child_config)
+            self.cache.put(key, documents)
+
+        # Callers may mutate what they receive; keep the cached Documents intact
+        return [Document(page_content=document.page_content, metadata=dict(document.metadata))
+                for document in documents]
@@ -3,14 +3,22 @@ Azure RAG Foundation Components
 Core classes for PDF reading, text chunking, and basic search
 """
 
+import os
 import re
 import json
+import shutil
+import math
+import heapq
 import pickle
 import logging
 import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from datetime import datetime
 from collections import Counter
+from collections.abc import Sequence
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple, Union
 
 
@@ -51,52 +59,144 @@ class SimplePDFReader:
             raise Exception(f"Error reading PDF {pdf_path}: {str(e)}")
 
 
+# Marks a field a chunk does not have (distinct from a stored None)
+_MISSING = object()
+
+
+def _assign_chunk_ids(chunks, first_chunk_id):
+    """Number chunks from first_chunk_id on, keeping the per-document position
+    as chunk_index; returns the next free chunk id"""
+    for chunk_index, chunk in enumerate(chunks):
+        chunk['chunk_id'] = first_chunk_id + chunk_index
+        chunk['chunk_index'] = chunk_index
+    return first_chunk_id + len(chunks)
+
+
+class TokenCounter:
+    """Fast token counter backed by a locally loaded Hugging Face tokenizer
+    
+    Counts exclude special tokens ([CLS]/[SEP]) so they add up across text
+    pieces; repeated counts of the same text are served from an LRU cache.
+    """
+    
+    def __init__(self, config=None, model_name=None, tokenizer=None, cache_size=65536):
+        """Load the tokenizer (or reuse an already loaded one)"""
+        self.model_name = model_name or getattr(config, 'TOKENIZER_MODEL', None)
+        
+        if tokenizer is None:
+            try:
+                from transformers import AutoTokenizer
+            except ImportError:
+                raise Exception("transformers not installed. Run: pip install transformers")
+            
+            if not self.model_name:
+                raise ValueError("No tokenizer model configured (set TOKENIZER_MODEL)")
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        
+        self.tokenizer = tokenizer
+        self.count = lru_cache(maxsize=cache_size)(self._count_tokens)
+    
+    def _count_tokens(self, text):
+        """Number of tokens in text, without special tokens"""
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def count_many(self, texts):
+        """Token counts for a list of texts in one batched tokenizer call"""
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), add_special_tokens=False)['input_ids']
+        return [len(ids) for ids in encoded]
+    
+    def split_spans(self, text, max_tokens):
+        """Split text into (start, end) character spans of at most max_tokens tokens
+        
+        Used for single sentences that do not fit the token budget on their own;
+        requires a fast tokenizer for the offset mapping.
+        """
+        offsets = self.tokenizer(text, add_special_tokens=False,
+                                 return_offsets_mapping=True)['offset_mapping']
+        spans = []
+        for first in range(0, len(offsets), max_tokens):
+            window = offsets[first:first + max_tokens]
+            spans.append((window[0][0], window[-1][1]))
+        return spans
+    
+    def cache_info(self):
+        """Hit/miss statistics of the count() cache"""
+        return self.count.cache_info()
+
+
 class SmartTextChunker:
     """Intelligent text chunking for Azure RAG system"""
     
-    def __init__(self, config):
-        """Initialize with configuration settings"""
+    # Split points: sentence endings followed by a space/newline, and line breaks
+    SENTENCE_END = re.compile(r'[.!?](?=[ \n])')
+    LINE_BREAK = re.compile(r'\n')
+    
+    def __init__(self, config, token_counter=None, first_chunk_id=0):
+        """Initialize with configuration settings
+        
+        Pass a TokenCounter to size chunks by tokens (CHUNK_SIZE_TOKENS /
+        CHUNK_OVERLAP_TOKENS) instead of characters.
+        
+        chunk_id is global across every document this chunker processes
+        (compact, starting at first_chunk_id); chunk_index is the position
+        within the document.
+        """
         self.config = config
-        self.chunk_size = config.CHUNK_SIZE
-        self.chunk_overlap = config.CHUNK_OVERLAP
+        self.token_counter = token_counter
+        self.next_chunk_id = first_chunk_id
+        
+        if token_counter is not None:
+            self.chunk_size = config.CHUNK_SIZE_TOKENS
+            self.chunk_overlap = config.CHUNK_OVERLAP_TOKENS
+            unit = "tokens"
+        else:
+            self.chunk_size = config.CHUNK_SIZE
+            self.chunk_overlap = config.CHUNK_OVERLAP
+            unit = "characters"
         
         print(f"🎯 Chunker initialized:")
-        print(f"   📏 Chunk size: {self.chunk_size} characters")
-        print(f"   🔄 Overlap: {self.chunk_overlap} characters ({self.chunk_overlap/self.chunk_size*100:.1f}%)")
+        print(f"   📏 Chunk size: {self.chunk_size} {unit}")
+        print(f"   🔄 Overlap: {self.chunk_overlap} {unit} ({self.chunk_overlap/self.chunk_size*100:.1f}%)")
     
     def clean_text(self, text):
         """Clean and normalize text before chunking"""
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove excessive line breaks (keep paragraph breaks)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        
-        # Strip leading/trailing whitespace
-        text = text.strip()
-        
-        return text
+        # Collapse every whitespace run (line breaks included) to a single
+        # space and strip leading/trailing whitespace in one pass
+        return ' '.join(text.split())
     
-    def find_sentence_boundary(self, text, ideal_position):
-        """Find the best place to split text (prefer sentence endings)"""
+    @classmethod
+    def find_boundaries(cls, text):
+        """Precompute sorted sentence-ending and line-break offsets in one pass each"""
+        sentence_ends = [match.start() for match in cls.SENTENCE_END.finditer(text)]
+        line_breaks = [match.start() for match in cls.LINE_BREAK.finditer(text)]
+        return sentence_ends, line_breaks
+    
+    @classmethod
+    def find_sentence_boundary(cls, text, ideal_position, boundaries=None):
+        """Find the best place to split text (prefer sentence endings)
+        
+        Pass the result of find_boundaries() to avoid rescanning the text;
+        each lookup is then a binary search.
+        """
         # Don't search past the end of text
         if ideal_position >= len(text):
             return len(text)
-            
+        
+        if boundaries is None:
+            boundaries = cls.find_boundaries(text)
+        sentence_ends, line_breaks = boundaries
+        
         # Look for sentence endings near the ideal position
         search_range = min(100, len(text) - ideal_position)
+        search_start = max(0, ideal_position - search_range)
         
-        # Search backwards from ideal position for sentence endings
-        for i in range(ideal_position, max(0, ideal_position - search_range), -1):
-            if i < len(text) and text[i] in '.!?':
-                # Make sure it's not just an abbreviation
-                if i + 1 < len(text) and text[i + 1] in ' \n':
-                    return i + 1
-        
-        # If no sentence ending found, look for paragraph breaks
-        for i in range(ideal_position, max(0, ideal_position - search_range), -1):
-            if i < len(text) and text[i] == '\n':
-                return i + 1
+        # Prefer the last sentence ending, then the last line break, in the window
+        for offsets in (sentence_ends, line_breaks):
+            index = bisect_right(offsets, ideal_position) - 1
+            if index >= 0 and offsets[index] > search_start:
+                return offsets[index] + 1
         
         # If nothing found, use the ideal position
         return ideal_position
@@ -104,6 +204,9 @@ class SmartTextChunker:
     def create_chunks(self, text, source_info="Unknown"):
         """Split text into overlapping chunks with smart boundaries"""
         
+        if self.token_counter is not None:
+            return self.create_token_chunks(text, source_info)
+        
         # Clean the text first
         text = self.clean_text(text)
         
@@ -111,7 +214,7 @@ class SmartTextChunker:
         
         if len(text) <= self.chunk_size:
             # Text is small enough to be one chunk
-            return [{
+            chunks = [{
                 'content': text,
                 'chunk_id': 0,
                 'source': source_info,
@@ -120,10 +223,13 @@ class SmartTextChunker:
                 'char_count': len(text),
                 'word_count': len(text.split())
             }]
+            self.next_chunk_id = _assign_chunk_ids(chunks, self.next_chunk_id)
+            return chunks
         
         chunks = []
         start_pos = 0
         chunk_id = 0
+        boundaries = self.find_boundaries(text)
         
         print(f"📦 Starting chunking process...")
         
@@ -136,7 +242,7 @@ class SmartTextChunker:
                 end_pos = len(text)
             else:
                 # Find smart boundary
-                end_pos = self.find_sentence_boundary(text, ideal_end)
+                end_pos = self.find_sentence_boundary(text, ideal_end, boundaries)
             
             # Extract chunk content
             chunk_content = text[start_pos:end_pos].strip()
@@ -176,12 +282,99 @@ class SmartTextChunker:
                 break
                 
             start_pos = next_start
+        
+        self.next_chunk_id = _assign_chunk_ids(chunks, self.next_chunk_id)
+        print(f"✅ Chunking complete: {len(chunks)} chunks created")
+        return chunks
+    
+    def _sentence_units(self, text):
+        """Sentence spans of cleaned text with their token counts
+        
+        Sentences longer than the token budget are cut into budget-sized
+        pieces on token boundaries.
+        """
+        sentence_ends, _ = self.find_boundaries(text)
+        starts = [0] + [end + 2 for end in sentence_ends]
+        ends = [end + 1 for end in sentence_ends] + [len(text)]
+        spans = [(start, end) for start, end in zip(starts, ends) if start < end]
+        
+        counts = self.token_counter.count_many([text[start:end] for start, end in spans])
+        
+        units = []
+        for (start, end), tokens in zip(spans, counts):
+            if tokens <= self.chunk_size:
+                units.append((start, end, tokens))
+                continue
+            for piece_start, piece_end in self.token_counter.split_spans(text[start:end], self.chunk_size):
+                piece = text[start + piece_start:start + piece_end]
+                units.append((start + piece_start, start + piece_end, self.token_counter.count(piece)))
+        return units
+    
+    def create_token_chunks(self, text, source_info="Unknown"):
+        """Split text into chunks packed up to the token budget at sentence boundaries
+        
+        Whole sentences are added greedily until the next one would exceed
+        CHUNK_SIZE_TOKENS; each new chunk starts with the trailing sentences
+        of the previous one that fit in CHUNK_OVERLAP_TOKENS.
+        """
+        text = self.clean_text(text)
+        
+        print(f"📝 Processing text: {len(text):,} characters")
+        
+        if not text:
+            return []
+        
+        units = self._sentence_units(text)
+        
+        print(f"📦 Packing {len(units)} sentences into {self.chunk_size}-token chunks...")
+        
+        chunks = []
+        window = []
+        window_tokens = 0
+        
+        def emit(window, window_tokens):
+            start_pos, end_pos = window[0][0], window[-1][1]
+            chunk_content = text[start_pos:end_pos]
+            chunks.append({
+                'content': chunk_content,
+                'chunk_id': len(chunks),
+                'source': source_info,
+                'char_start': start_pos,
+                'char_end': end_pos,
+                'char_count': len(chunk_content),
+                'word_count': len(chunk_content.split()),
+                'token_count': window_tokens
+            })
+            if len(chunks) <= 3:
+                print(f"   📦 Chunk {len(chunks)}: {start_pos}-{end_pos} ({window_tokens} tokens)")
+        
+        for unit in units:
+            unit_tokens = unit[2]
+            if window and window_tokens + unit_tokens > self.chunk_size:
+                emit(window, window_tokens)
+                
+                # Carry the trailing sentences that fit the overlap budget
+                overlap = []
+                overlap_tokens = 0
+                for previous in reversed(window):
+                    if overlap_tokens + previous[2] > self.chunk_overlap:
+                        break
+                    overlap.append(previous)
+                    overlap_tokens += previous[2]
+                window = overlap[::-1]
+                window_tokens = overlap_tokens
+                
+                # Drop overlap from the front until the new sentence fits
+                while window and window_tokens + unit_tokens > self.chunk_size:
+                    window_tokens -= window.pop(0)[2]
             
-            # Safety check to prevent infinite loops
-            if chunk_id > 100:  # Reasonable limit for any document
-                print(f"⚠️  Safety limit reached at {chunk_id} chunks")
-                break
+            window.append(unit)
+            window_tokens += unit_tokens
+        
+        if window:
+            emit(window, window_tokens)
         
+        self.next_chunk_id = _assign_chunk_ids(chunks, self.next_chunk_id)
         print(f"✅ Chunking complete: {len(chunks)} chunks created")
         return chunks
     
@@ -193,7 +386,7 @@ class SmartTextChunker:
         char_counts = [chunk['char_count'] for chunk in chunks]
         word_counts = [chunk['word_count'] for chunk in chunks]
         
-        return {
+        stats = {
             'total_chunks': len(chunks),
             'avg_chars': sum(char_counts) / len(char_counts),
             'min_chars': min(char_counts),
@@ -202,125 +395,539 @@ class SmartTextChunker:
             'total_chars': sum(char_counts),
             'total_words': sum(word_counts)
         }
+        
+        token_counts = [chunk['token_count'] for chunk in chunks if 'token_count' in chunk]
+        if token_counts:
+            stats.update({
+                'avg_tokens': sum(token_counts) / len(token_counts),
+                'min_tokens': min(token_counts),
+                'max_tokens': max(token_counts),
+                'total_tokens': sum(token_counts)
+            })
+        
+        return stats
+
+
+class MarkdownSectionChunker:
+    """Structure-aware chunking for markdown produced by the PDF converter
+    
+    Parses the heading hierarchy in a single streaming pass over the lines
+    and packs each section's blocks into chunks that carry their section
+    path. Tables, image references and code fences are never split.
+    """
+    
+    HEADING = re.compile(r'(#{1,6})\s+(.+)')
+    IMAGE_REF = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+    SECTION_SEPARATOR = " > "
+    
+    def __init__(self, config, token_counter=None, first_chunk_id=0):
+        """Initialize with configuration settings
+        
+        Chunk budgets are CHUNK_SIZE characters, or CHUNK_SIZE_TOKENS when a
+        TokenCounter is given. Chunk ids are global across documents, as in
+        SmartTextChunker.
+        """
+        self.config = config
+        self.token_counter = token_counter
+        self.next_chunk_id = first_chunk_id
+        self.chunk_size = config.CHUNK_SIZE_TOKENS if token_counter is not None else config.CHUNK_SIZE
+        
+        unit = "tokens" if token_counter is not None else "characters"
+        print(f"🎯 Markdown section chunker initialized:")
+        print(f"   📏 Chunk size: {self.chunk_size} {unit}")
+    
+    def _measure(self, text):
+        """Size of text in the configured unit"""
+        if self.token_counter is not None:
+            return self.token_counter.count(text)
+        return len(text)
+    
+    @staticmethod
+    def _heading_title(raw_title):
+        """Heading text without bold/italic markers"""
+        return raw_title.strip().strip('*_').strip()
+    
+    def iter_chunks(self, lines, source_info="Unknown"):
+        """Yield chunks from an iterable of markdown lines (e.g. an open file)
+        
+        Lines are expected to keep their line endings, as file iteration and
+        str.splitlines(keepends=True) do; char offsets refer to the input.
+        """
+        heading_stack = []      # (level, title) of the enclosing headings
+        section_lines = []      # raw lines of the current section
+        section_offset = 0      # char offset of the section's first line
+        blocks = []             # [first_line, end_line, kind] within the section
+        block_open = False      # whether the next line may extend blocks[-1]
+        in_fence = False
+        offset = 0
+        chunk_index = 0
+        
+        def flush():
+            path = self.SECTION_SEPARATOR.join(title for _, title in heading_stack)
+            return self._pack_section(section_lines, blocks, section_offset,
+                                      path, len(heading_stack), source_info)
+        
+        for line in lines:
+            stripped = line.strip()
+            
+            if in_fence:
+                section_lines.append(line)
+                blocks[-1][1] = len(section_lines)
+                if stripped.startswith('```') or stripped.startswith('~~~'):
+                    in_fence = False
+                    block_open = False
+                offset += len(line)
+                continue
+            
+            heading = self.HEADING.match(stripped) if stripped.startswith('#') else None
+            
+            if heading:
+                for chunk in flush():
+                    chunk['chunk_id'] = self.next_chunk_id
+                    chunk['chunk_index'] = chunk_index
+                    self.next_chunk_id += 1
+                    chunk_index += 1
+                    yield chunk
+                
+                level = len(heading.group(1))
+                while heading_stack and heading_stack[-1][0] >= level:
+                    heading_stack.pop()
+                heading_stack.append((level, self._heading_title(heading.group(2))))
+                
+                # The heading line is the first block, so it leads the section's first chunk
+                section_lines = [line]
+                section_offset = offset
+                blocks = [[0, 1, 'heading']]
+                block_open = False
+            
+            elif not stripped:
+                section_lines.append(line)
+                block_open = False
+            
+            else:
+                if stripped.startswith('```') or stripped.startswith('~~~'):
+                    kind = 'fence'
+                    in_fence = True
+                elif stripped.startswith('|'):
+                    kind = 'table'
+                elif self.IMAGE_REF.fullmatch(stripped):
+                    kind = 'image'
+                else:
+                    kind = 'text'
+                
+                section_lines.append(line)
+                if block_open and blocks[-1][2] == kind and kind in ('text', 'table'):
+                    blocks[-1][1] = len(section_lines)
+                else:
+                    blocks.append([len(section_lines) - 1, len(section_lines), kind])
+                block_open = kind in ('text', 'table')
+            
+            offset += len(line)
+        
+        for chunk in flush():
+            chunk['chunk_id'] = self.next_chunk_id
+            chunk['chunk_index'] = chunk_index
+            self.next_chunk_id += 1
+            chunk_index += 1
+            yield chunk
+    
+    def _split_line(self, line):
+        """Cut one over-budget line into (start, end, size) spans within the budget
+        
+        Uses SmartTextChunker's boundary search: in character mode cuts fall
+        on the last sentence ending before the budget; in token mode the line
+        is split into sentences and sentences still over budget are cut on
+        token boundaries.
+        """
+        boundaries = SmartTextChunker.find_boundaries(line)
+        spans = []
+        
+        if self.token_counter is None:
+            start = 0
+            while start < len(line):
+                end = SmartTextChunker.find_sentence_boundary(line, start + self.chunk_size, boundaries)
+                if end <= start:
+                    end = min(len(line), start + self.chunk_size)
+                spans.append((start, end, end - start))
+                start = end
+            return spans
+        
+        sentence_ends, _ = boundaries
+        cuts = [0] + [end + 1 for end in sentence_ends] + [len(line)]
+        for start, end in zip(cuts, cuts[1:]):
+            if start >= end:
+                continue
+            size = self.token_counter.count(line[start:end])
+            if size <= self.chunk_size:
+                spans.append((start, end, size))
+                continue
+            for piece_start, piece_end in self.token_counter.split_spans(line[start:end], self.chunk_size):
+                piece = line[start + piece_start:start + piece_end]
+                spans.append((start + piece_start, start + piece_end, self.token_counter.count(piece)))
+        return spans
+    
+    def _pack_section(self, section_lines, blocks, section_offset, section_path, section_level, source_info):
+        """Greedily pack a section's blocks into chunks within the size budget
+        
+        Oversized text blocks are split into lines, and lines still over
+        the budget on sentence (or token) boundaries; tables, images and
+        code fences stay whole even when they exceed the budget. A section
+        that holds nothing but its heading produces no chunk.
+        """
+        if not any(kind != 'heading' for _, _, kind in blocks):
+            return []
+        
+        # Line offsets within the section
+        line_offsets = [0]
+        for line in section_lines:
+            line_offsets.append(line_offsets[-1] + len(line))
+        section_text = "".join(section_lines)
+        
+        # Units are (start, end, size) character spans of the section text
+        units = []
+        for first, end, kind in blocks:
+            size = self._measure(section_text[line_offsets[first]:line_offsets[end]])
+            if kind != 'text' or size <= self.chunk_size:
+                units.append((line_offsets[first], line_offsets[end], size))
+                continue
+            for line in range(first, end):
+                line_size = self._measure(section_lines[line]) if end - first > 1 else size
+                if line_size <= self.chunk_size:
+                    units.append((line_offsets[line], line_offsets[line + 1], line_size))
+                else:
+                    units.extend((line_offsets[line] + start, line_offsets[line] + stop, span_size)
+                                 for start, stop, span_size in self._split_line(section_lines[line]))
+        
+        chunks = []
+        
+        def emit(group, size):
+            start, end = group[0][0], group[-1][1]
+            raw = section_text[start:end]
+            content = raw.strip()
+            start_pos = section_offset + start + (len(raw) - len(raw.lstrip()))
+            chunk = {
+                'content': content,
+                'chunk_id': len(chunks),
+                'source': source_info,
+                'char_start': start_pos,
+                'char_end': start_pos + len(content),
+                'char_count': len(content),
+                'word_count': len(content.split()),
+                'section_path': section_path,
+                'section_level': section_level
+            }
+            if self.token_counter is not None:
+                chunk['token_count'] = size
+            chunks.append(chunk)
+        
+        group = []
+        group_size = 0
+        for unit in units:
+            if group and group_size + unit[2] > self.chunk_size:
+                emit(group, group_size)
+                group = []
+                group_size = 0
+            group.append(unit)
+            group_size += unit[2]
+        if group:
+            emit(group, group_size)
+        
+        return chunks
+    
+    def create_chunks(self, text, source_info="Unknown"):
+        """Split a markdown document into section-aware chunks"""
+        chunks = list(self.iter_chunks(text.splitlines(keepends=True), source_info))
+        print(f"✅ Section chunking complete: {len(chunks)} chunks created")
+        return chunks
 
 
 class BasicTextSearcher:
-    """Simple but effective text search for Azure RAG foundation"""
+    """Simple but effective text search for Azure RAG foundation
+    
+    Okapi BM25 over an inverted index. Chunks get integer doc ids (their
+    position in self.chunks); each term maps to array-backed postings of
+    (doc ids, term frequencies, position offsets, token positions), so a
+    query only touches the postings of its own terms. Token positions
+    answer quoted phrase queries and proximity scoring from the index
+    alone. Chunks are looked up by their global chunk_id through a dense
+    chunk_id -> doc id array.
+    """
+    
+    TOKEN = re.compile(r'\w+')
+    PHRASE = re.compile(r'"([^"]+)"')
+    
+    # BM25 parameters: term-frequency saturation and length normalization
+    K1 = 1.5
+    B = 0.75
+    
+    # Proximity: consecutive query terms within PROXIMITY_WINDOW tokens add up
+    # to PROXIMITY_WEIGHT each (full weight when adjacent); applied to the
+    # RERANK_DEPTH best BM25 candidates
+    PROXIMITY_WEIGHT = 1.0
+    PROXIMITY_WINDOW = 5
+    RERANK_DEPTH = 100
     
     def __init__(self, config):
         """Initialize with configuration"""
         self.config = config
-        self.chunks = []  # Will store our text chunks
-        self.search_index = {}  # Simple keyword index
+        self.chunks = []  # Will store our text chunks, doc id = position
+        self.search_index = {}  # term -> (doc ids, term frequencies, position offsets, positions)
+        self.doc_lengths = array('I')  # tokens per chunk, by doc id
+        self.total_length = 0
+        self.doc_ids = array('q')  # chunk_id -> doc id, -1 where unused
         
         print(f"🎯 Search system initialized")
         print(f"   🔍 Ready to index chunks")
         print(f"   📊 Will track search statistics")
     
     def add_chunks(self, chunks: List[Dict]):
-        """Add chunks to our search system"""
+        """Add chunks to our search system
+        
+        chunk_id must be unique across everything added; chunkers hand out
+        global ids, so chunks of many documents can share one index.
+        """
+        new_ids = [chunk['chunk_id'] for chunk in chunks]
+        if len(set(new_ids)) != len(new_ids) or any(self.get_chunk(chunk_id) is not None for chunk_id in new_ids):
+            raise ValueError("Duplicate chunk_id: chunks must have globally unique ids "
+                             "(use one chunker instance, or first_chunk_id, across documents)")
+        
+        first_doc_id = len(self.chunks)
+        if new_ids and max(new_ids) >= len(self.doc_ids):
+            self.doc_ids.extend([-1] * (max(new_ids) + 1 - len(self.doc_ids)))
+        for doc_id, chunk_id in enumerate(new_ids, first_doc_id):
+            self.doc_ids[chunk_id] = doc_id
+        
         self.chunks.extend(chunks)
-        self._build_search_index(chunks)
+        self._build_search_index(chunks, first_doc_id)
         
         print(f"📚 Added {len(chunks)} chunks to search index")
         print(f"   📦 Total chunks in system: {len(self.chunks)}")
         print(f"   🔑 Index contains {len(self.search_index)} unique terms")
     
-    def _build_search_index(self, chunks: List[Dict]):
-        """Build a simple keyword index for fast searching"""
-        for chunk in chunks:
-            chunk_id = chunk['chunk_id']
-            text = chunk['content'].lower()
+    def get_chunk(self, chunk_id: int) -> Optional[Dict]:
+        """Chunk with the given chunk_id, or None (constant time)"""
+        if 0 <= chunk_id < len(self.doc_ids):
+            doc_id = self.doc_ids[chunk_id]
+            if doc_id >= 0:
+                return self.chunks[doc_id]
+        return None
+    
+    def _build_search_index(self, chunks: List[Dict], first_doc_id: int = 0):
+        """Append postings for chunks whose doc ids start at first_doc_id
+        
+        Doc ids only grow, so every posting list stays sorted without
+        any duplicate checks. The positions of a term in a doc are
+        positions[offsets[i]:offsets[i] + tfs[i]] for posting i.
+        """
+        index = self.search_index
+        for doc_id, chunk in enumerate(chunks, first_doc_id):
+            words = self.TOKEN.findall(chunk['content'].lower())
+            self.doc_lengths.append(len(words))
+            self.total_length += len(words)
             
-            # Extract words (simple tokenization)
-            words = re.findall(r'\b\w+\b', text)
+            term_positions = {}
+            for position, word in enumerate(words):
+                positions = term_positions.get(word)
+                if positions is None:
+                    term_positions[word] = [position]
+                else:
+                    positions.append(position)
             
-            # Add to inverted index
-            for word in words:
-                if word not in self.search_index:
-                    self.search_index[word] = []
-                
-                # Only add if not already there (avoid duplicates)
-                if chunk_id not in [item['chunk_id'] for item in self.search_index[word]]:
-                    self.search_index[word].append({
-                        'chunk_id': chunk_id,
-                        'source': chunk['source']
-                    })
+            for word, positions in term_positions.items():
+                postings = index.get(word)
+                if postings is None:
+                    postings = index[word] = (array('I'), array('I'), array('Q'), array('I'))
+                postings[0].append(doc_id)
+                postings[1].append(len(positions))
+                postings[2].append(len(postings[3]))
+                postings[3].extend(positions)
     
-    def _calculate_relevance_score(self, chunk: Dict, query_terms: List[str]) -> float:
-        """Calculate how relevant a chunk is to the query"""
-        content = chunk['content'].lower()
+    def _term_weights(self, term: str):
+        """Postings and BM25 idf * (k1 + 1) for a term, or None if unindexed"""
+        postings = self.search_index.get(term)
+        if postings is None:
+            return None
+        doc_count = len(self.chunks)
+        df = len(postings[0])
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        return postings, idf * (self.K1 + 1)
+    
+    def _length_norm(self):
+        """Constants of the BM25 length normalization k1 * (1 - b + b * dl / avgdl)"""
+        avg_length = self.total_length / len(self.chunks) if self.chunks else 0.0
+        norm_base = self.K1 * (1 - self.B)
+        norm_scale = self.K1 * self.B / avg_length if avg_length else 0.0
+        return norm_base, norm_scale
+    
+    def _score_documents(self, query_terms: List[str]) -> Dict[int, float]:
+        """BM25 score for every doc id that contains at least one query term"""
+        norm_base, norm_scale = self._length_norm()
+        doc_lengths = self.doc_lengths
+        scores = {}
+        
+        for term in dict.fromkeys(query_terms):
+            weights = self._term_weights(term)
+            if weights is None:
+                continue
+            postings, weight = weights
+            for doc_id, tf in zip(postings[0], postings[1]):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (
+                    tf + norm_base + norm_scale * doc_lengths[doc_id])
+        
+        return scores
+    
+    def _posting_index(self, term: str, doc_id: int) -> int:
+        """Index of doc_id in the term's (sorted) posting list, or -1"""
+        postings = self.search_index.get(term)
+        if postings is None:
+            return -1
+        doc_ids = postings[0]
+        index = bisect_left(doc_ids, doc_id)
+        return index if index < len(doc_ids) and doc_ids[index] == doc_id else -1
+    
+    def _has_term(self, doc_id: int, term: str) -> bool:
+        """Whether doc_id appears in the term's posting list"""
+        return self._posting_index(term, doc_id) >= 0
+    
+    def _term_positions(self, term: str, doc_id: int):
+        """Sorted token positions of term in doc_id (empty if absent)"""
+        index = self._posting_index(term, doc_id)
+        if index < 0:
+            return ()
+        _, tfs, offsets, positions = self.search_index[term]
+        return positions[offsets[index]:offsets[index] + tfs[index]]
+    
+    def _phrase_count(self, phrase_terms: List[str], doc_id: int) -> int:
+        """Occurrences of the exact token sequence phrase_terms in doc_id"""
+        first_positions = self._term_positions(phrase_terms[0], doc_id)
+        if not first_positions:
+            return 0
+        
+        # Starting positions that remain consistent with every later term
+        starts = set(first_positions)
+        for offset, term in enumerate(phrase_terms[1:], 1):
+            positions = self._term_positions(term, doc_id)
+            starts.intersection_update(position - offset for position in positions)
+            if not starts:
+                return 0
+        return len(starts)
+    
+    def _proximity_score(self, query_terms: List[str], doc_id: int) -> float:
+        """Bonus for consecutive query terms that occur close together in doc_id"""
+        window = self.PROXIMITY_WINDOW
         score = 0.0
         
-        # Count term matches
-        for term in query_terms:
-            term_count = content.count(term.lower())
-            if term_count > 0:
-                # Term frequency score (more mentions = higher score)
-                tf_score = term_count / len(content.split())
-                score += tf_score
-                
-                # Bonus for exact phrase matches
-                if len(query_terms) > 1 and ' '.join(query_terms).lower() in content:
-                    score += 0.5
+        for left, right in zip(query_terms, query_terms[1:]):
+            if left == right:
+                continue
+            left_positions = self._term_positions(left, doc_id)
+            right_positions = self._term_positions(right, doc_id)
+            if not left_positions or not right_positions:
+                continue
+            
+            # Smallest distance between the two sorted position lists
+            gap = window + 1
+            i = j = 0
+            while i < len(left_positions) and j < len(right_positions):
+                distance = right_positions[j] - left_positions[i]
+                if abs(distance) < gap:
+                    gap = abs(distance)
+                if distance > 0:
+                    i += 1
+                else:
+                    j += 1
+            
+            if gap <= window:
+                score += self.PROXIMITY_WEIGHT * (window - gap + 1) / window
         
-        # Bonus for Azure-specific terms (domain relevance)
-        azure_terms = ['azure', 'vnet', 'subnet', 'nsg', 'load balancer', 'network']
-        azure_bonus = sum(1 for term in azure_terms if term in content) * 0.1
-        score += azure_bonus
+        return score
+    
+    def _calculate_relevance_score(self, chunk: Dict, query_terms: List[str]) -> float:
+        """BM25 plus proximity relevance of a chunk to the query
         
+        Indexed chunks are scored from the postings alone; other chunks
+        fall back to tokenizing their content (BM25 only).
+        """
+        query_terms = [term.lower() for term in query_terms]
+        norm_base, norm_scale = self._length_norm()
+        score = 0.0
+        
+        doc_id = self.doc_ids[chunk['chunk_id']] if 0 <= chunk.get('chunk_id', -1) < len(self.doc_ids) else -1
+        if doc_id >= 0 and self.chunks[doc_id] is chunk:
+            doc_length = self.doc_lengths[doc_id]
+            for term in dict.fromkeys(query_terms):
+                index = self._posting_index(term, doc_id)
+                if index >= 0:
+                    postings, weight = self._term_weights(term)
+                    tf = postings[1][index]
+                    score += weight * tf / (tf + norm_base + norm_scale * doc_length)
+            return score + self._proximity_score(query_terms, doc_id)
+        
+        words = self.TOKEN.findall(chunk['content'].lower())
+        term_counts = Counter(words)
+        for term in dict.fromkeys(query_terms):
+            tf = term_counts.get(term, 0)
+            weights = self._term_weights(term) if tf else None
+            if weights is not None:
+                score += weights[1] * tf / (tf + norm_base + norm_scale * len(words))
         return score
     
-    def search(self, query: str, max_results: int = 5) -> List[Dict]:
-        """Search for chunks matching the query"""
+    def search(self, query: str, max_results: int = 5, verbose: bool = True) -> List[Dict]:
+        """Search for chunks matching the query (verbose=False skips the progress output)
+        
+        Quoted phrases ("backend pool") must occur verbatim in a result;
+        all other terms are ranked by BM25 plus a proximity bonus.
+        """
         if not query.strip():
             return []
         
-        print(f"\n🔍 Searching for: '{query}'")
+        if verbose:
+            print(f"\n🔍 Searching for: '{query}'")
         
-        # Prepare query terms
-        query_terms = re.findall(r'\b\w+\b', query.lower())
-        print(f"   📝 Query terms: {query_terms}")
+        # Prepare query terms and quoted phrases
+        query_terms = self.TOKEN.findall(query.lower())
+        phrases = [terms for terms in (self.TOKEN.findall(phrase.lower()) for phrase in self.PHRASE.findall(query))
+                   if len(terms) > 1]
+        if verbose:
+            print(f"   📝 Query terms: {query_terms}")
+            if phrases:
+                print(f"   🔗 Phrases: {[' '.join(terms) for terms in phrases]}")
         
-        # Find candidate chunks
-        candidate_chunks = set()
+        # Score candidates straight from the postings
+        scores = self._score_documents(query_terms)
         
-        for term in query_terms:
-            if term in self.search_index:
-                for item in self.search_index[term]:
-                    candidate_chunks.add(item['chunk_id'])
+        if phrases:
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if all(self._phrase_count(terms, doc_id) for terms in phrases)}
         
-        print(f"   📦 Found {len(candidate_chunks)} candidate chunks")
+        if verbose:
+            print(f"   📦 Found {len(scores)} candidate chunks")
         
-        if not candidate_chunks:
-            print(f"   ❌ No matches found")
+        if not scores:
+            if verbose:
+                print(f"   ❌ No matches found")
             return []
         
-        # Score and rank chunks
-        scored_chunks = []
-        
-        for chunk_id in candidate_chunks:
-            # Find the actual chunk
-            chunk = next((c for c in self.chunks if c['chunk_id'] == chunk_id), None)
-            if chunk:
-                score = self._calculate_relevance_score(chunk, query_terms)
-                if score > 0:
-                    scored_chunks.append({
-                        'chunk': chunk,
-                        'score': score,
-                        'matched_terms': [term for term in query_terms 
-                                        if term in chunk['content'].lower()]
-                    })
-        
-        # Sort by relevance score (highest first)
-        scored_chunks.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Return top results
-        results = scored_chunks[:max_results]
-        
-        print(f"   ✅ Returning top {len(results)} results")
-        for i, result in enumerate(results, 1):
-            print(f"      {i}. Score: {result['score']:.3f} | Terms: {result['matched_terms']}")
+        # Rerank the best BM25 candidates with proximity, ties in index order
+        ranking_key = lambda item: (-item[1], item[0])
+        candidates = heapq.nsmallest(max(self.RERANK_DEPTH, max_results), scores.items(), key=ranking_key)
+        if len(set(query_terms)) > 1:
+            candidates = [(doc_id, score + self._proximity_score(query_terms, doc_id))
+                          for doc_id, score in candidates]
+        top = heapq.nsmallest(max_results, candidates, key=ranking_key)
+        
+        results = []
+        for doc_id, score in top:
+            results.append({
+                'chunk': self.chunks[doc_id],
+                'score': score,
+                'matched_terms': [term for term in query_terms if self._has_term(doc_id, term)]
+            })
+        
+        if verbose:
+            print(f"   ✅ Returning top {len(results)} results")
+            for i, result in enumerate(results, 1):
+                print(f"      {i}. Score: {result['score']:.3f} | Terms: {result['matched_terms']}")
         
         return results
     
@@ -337,6 +944,7 @@ class BasicTextSearcher:
         return {
             'total_chunks': len(self.chunks),
             'total_terms_indexed': len(self.search_index),
+            'avg_doc_length': self.total_length / len(self.chunks),
             'avg_chunk_size': sum(chunk_sizes) / len(chunk_sizes),
             'min_chunk_size': min(chunk_sizes),
             'max_chunk_size': max(chunk_sizes),
@@ -345,9 +953,308 @@ class BasicTextSearcher:
         }
 
 
+class SparseBM25Searcher(BasicTextSearcher):
+    """BM25 search with a SciPy sparse term-document matrix for batch queries
+    
+    The index is the same as BasicTextSearcher's; on first use it is frozen
+    into a CSR matrix of precomputed BM25 weights (terms x chunks), so a
+    whole batch of queries is scored with one sparse matrix product.
+    Batch scores are pure BM25: phrase and proximity scoring need the
+    positional postings and are only applied by search().
+    """
+    
+    def __init__(self, config):
+        """Initialize with configuration"""
+        super().__init__(config)
+        self._matrix = None
+        self._vocabulary = None
+    
+    def add_chunks(self, chunks: List[Dict]):
+        """Add chunks to our search system (the weight matrix is rebuilt on next use)"""
+        super().add_chunks(chunks)
+        self._matrix = None
+        self._vocabulary = None
+    
+    def _build_weight_matrix(self):
+        """Freeze the postings into a CSR matrix of BM25 term weights"""
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError:
+            raise Exception("NumPy/SciPy not installed. Run: pip install numpy scipy")
+        
+        terms = list(self.search_index)
+        vocabulary = {term: row for row, term in enumerate(terms)}
+        
+        def as_numpy(values):
+            return np.frombuffer(values, dtype=np.dtype(values.typecode))
+        
+        postings = [self.search_index[term] for term in terms]
+        doc_ids = np.concatenate([as_numpy(p[0]) for p in postings] or [np.zeros(0, dtype=np.uint32)])
+        tfs = np.concatenate([as_numpy(p[1]) for p in postings] or [np.zeros(0)]).astype(np.float64)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(p[0]) for p in postings], out=indptr[1:])
+        
+        doc_count = len(self.chunks)
+        df = np.diff(indptr).astype(np.float64)
+        idf = np.log1p((doc_count - df + 0.5) / (df + 0.5))
+        
+        norm_base, norm_scale = self._length_norm()
+        doc_lengths = as_numpy(self.doc_lengths).astype(np.float64)
+        term_weight = np.repeat(idf * (self.K1 + 1), np.diff(indptr))
+        weights = term_weight * tfs / (tfs + norm_base + norm_scale * doc_lengths[doc_ids])
+        
+        self._matrix = sparse.csr_matrix((weights, doc_ids, indptr), shape=(len(terms), doc_count))
+        self._vocabulary = vocabulary
+        return self._matrix
+    
+    def search_batch(self, queries: List[str], max_results: int = 5, batch_size: int = 256) -> List[List[Dict]]:
+        """Search many queries at once; returns one result list per query
+        
+        Queries are scored batch_size at a time, which bounds the size of
+        the (queries x chunks) score matrix.
+        """
+        import numpy as np
+        from scipy import sparse
+        
+        matrix = self._matrix if self._matrix is not None else self._build_weight_matrix()
+        vocabulary = self._vocabulary
+        query_terms = [self.TOKEN.findall(query.lower()) for query in queries]
+        all_results = []
+        
+        for batch_start in range(0, len(queries), batch_size):
+            batch_terms = query_terms[batch_start:batch_start + batch_size]
+            
+            # Query-term incidence matrix (each distinct indexed term counts once)
+            rows, cols = [], []
+            for row, terms in enumerate(batch_terms):
+                for term in dict.fromkeys(terms):
+                    column = vocabulary.get(term)
+                    if column is not None:
+                        rows.append(row)
+                        cols.append(column)
+            incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                          shape=(len(batch_terms), matrix.shape[0]))
+            
+            scores = (incidence @ matrix).tocsr()
+            
+            for row, terms in enumerate(batch_terms):
+                begin, end = scores.indptr[row], scores.indptr[row + 1]
+                doc_ids = scores.indices[begin:end]
+                row_scores = scores.data[begin:end]
+                
+                if len(row_scores) > max_results:
+                    # Keep everything tied with the k-th best score so ties resolve by doc id
+                    kth_score = -np.partition(-row_scores, max_results - 1)[max_results - 1]
+                    keep = row_scores >= kth_score
+                    doc_ids, row_scores = doc_ids[keep], row_scores[keep]
+                # Highest score first, ties in index order
+                order = np.lexsort((doc_ids, -row_scores))[:max_results]
+                
+                all_results.append([{
+                    'chunk': self.chunks[doc_id],
+                    'score': float(row_scores[i]),
+                    'matched_terms': [term for term in terms if self._has_term(doc_id, term)]
+                } for i, doc_id in ((i, int(doc_ids[i])) for i in order)])
+        
+        print(f"🔍 Batch search: {len(queries)} queries over {len(self.chunks)} chunks")
+        return all_results
+
+
+class ChunkStore(Sequence):
+    """Columnar, memory-mapped chunk storage
+    
+    A store is a directory: all chunk text in one contiguous UTF-8 buffer
+    (content.bin) addressed by byte offsets, every other field as a typed
+    .npy column (strings dictionary-encoded), fields that fit no column
+    as one small pickle per chunk (extras.bin, also offset-addressed), and
+    a small meta.json header. Opening maps the files without reading them, and chunks are
+    materialized only when accessed.
+    """
+    
+    FORMAT = "columnar-v1"
+    META_FILE = "meta.json"
+    CONTENT_FILE = "content.bin"
+    OFFSETS_FILE = "content_offsets.npy"
+    EXTRAS_FILE = "extras.bin"
+    EXTRAS_OFFSETS_FILE = "extras_offsets.npy"
+    
+    def __init__(self, path):
+        """Open a store directory (memory-maps every column)"""
+        import numpy as np
+        
+        self.path = Path(path)
+        with open(self.path / self.META_FILE, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        
+        self.metadata = self.meta['metadata']
+        self._length = self.meta['length']
+        self._fields = self.meta['fields']
+        self._offsets = np.load(self.path / self.OFFSETS_FILE, mmap_mode='r')
+        self._content = (np.memmap(self.path / self.CONTENT_FILE, dtype=np.uint8, mode='r')
+                         if self._offsets[-1] > 0 else np.zeros(0, dtype=np.uint8))
+        
+        self._columns = {}
+        self._values = {}
+        for name, column in self.meta['columns'].items():
+            self._columns[name] = np.load(self.path / column['file'], mmap_mode='r')
+        
+        self._extras = self._extras_offsets = None
+        if self.meta['extras']:
+            self._extras_offsets = np.load(self.path / self.EXTRAS_OFFSETS_FILE, mmap_mode='r')
+            self._extras = np.memmap(self.path / self.EXTRAS_FILE, dtype=np.uint8, mode='r')
+    
+    @classmethod
+    def write(cls, path, chunks, metadata):
+        """Write chunks as a columnar store at path (replaced atomically)"""
+        import numpy as np
+        
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+        if temp_path.exists():
+            shutil.rmtree(temp_path)
+        temp_path.mkdir(parents=True)
+        
+        # Text: one buffer plus byte offsets
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        with open(temp_path / cls.CONTENT_FILE, 'wb') as f:
+            position = 0
+            for i, chunk in enumerate(chunks):
+                encoded = chunk['content'].encode('utf-8')
+                f.write(encoded)
+                position += len(encoded)
+                offsets[i + 1] = position
+        np.save(temp_path / cls.OFFSETS_FILE, offsets)
+        
+        # Other fields: typed columns when every chunk has a value of one
+        # scalar type (str columns may have gaps), anything else is pickled
+        # per chunk
+        fields = list(dict.fromkeys(key for chunk in chunks for key in chunk if key != 'content'))
+        columns = {}
+        extras = []
+        for name in fields:
+            values = [chunk.get(name, _MISSING) for chunk in chunks]
+            kinds = {type(value) for value in values}
+            file_name = f"col_{len(columns)}.npy"
+            
+            if kinds == {bool}:
+                np.save(temp_path / file_name, np.array(values, dtype=np.bool_))
+                columns[name] = {'file': file_name, 'kind': 'bool'}
+            elif kinds == {int}:
+                np.save(temp_path / file_name, np.array(values, dtype=np.int64))
+                columns[name] = {'file': file_name, 'kind': 'int'}
+            elif kinds <= {int, float} and kinds:
+                np.save(temp_path / file_name, np.array(values, dtype=np.float64))
+                columns[name] = {'file': file_name, 'kind': 'float'}
+            elif kinds and kinds <= {str, object}:
+                # Dictionary-encoded: codes column (-1 = missing) + distinct values
+                distinct = {}
+                codes = np.array([-1 if value is _MISSING else distinct.setdefault(value, len(distinct))
+                                  for value in values], dtype=np.int32)
+                np.save(temp_path / file_name, codes)
+                values_file = f"col_{len(columns)}.values.json"
+                with open(temp_path / values_file, 'w', encoding='utf-8') as f:
+                    json.dump(list(distinct), f, ensure_ascii=False)
+                columns[name] = {'file': file_name, 'kind': 'str', 'values_file': values_file}
+            else:
+                extras.append(name)
+        
+        if extras:
+            # One pickled {field: value} dict per chunk that has any extras
+            extras_offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+            with open(temp_path / cls.EXTRAS_FILE, 'wb') as f:
+                position = 0
+                for i, chunk in enumerate(chunks):
+                    row = {name: chunk[name] for name in extras if name in chunk}
+                    if row:
+                        encoded = pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL)
+                        f.write(encoded)
+                        position += len(encoded)
+                    extras_offsets[i + 1] = position
+            np.save(temp_path / cls.EXTRAS_OFFSETS_FILE, extras_offsets)
+        
+        meta = {
+            'format': cls.FORMAT,
+            'length': len(chunks),
+            'fields': fields,
+            'columns': columns,
+            'extras': extras,
+            'metadata': metadata
+        }
+        with open(temp_path / cls.META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        
+        if path.exists():
+            shutil.rmtree(path)
+        temp_path.rename(path)
+        return path
+    
+    def __len__(self):
+        return self._length
+    
+    def content_bytes(self, index: int):
+        """UTF-8 bytes of a chunk's text as a zero-copy view into the mapped buffer"""
+        return memoryview(self._content[self._offsets[index]:self._offsets[index + 1]])
+    
+    def content(self, index: int) -> str:
+        """Text of one chunk"""
+        return bytes(self.content_bytes(index)).decode('utf-8')
+    
+    def column(self, name: str):
+        """Memory-mapped array of a typed field (str fields return their codes)"""
+        return self._columns[name]
+    
+    def _column_values(self, name: str) -> List:
+        """Distinct values of a dictionary-encoded str column (loaded once)"""
+        values = self._values.get(name)
+        if values is None:
+            with open(self.path / self.meta['columns'][name]['values_file'], 'r', encoding='utf-8') as f:
+                values = self._values[name] = json.load(f)
+        return values
+    
+    def _extras_row(self, index: int) -> Dict:
+        """Fields of one chunk that are not stored as columns"""
+        if self._extras is None:
+            return {}
+        start, end = self._extras_offsets[index], self._extras_offsets[index + 1]
+        return pickle.loads(self._extras[start:end]) if end > start else {}
+    
+    def _field(self, name: str, index: int):
+        """Value of one column field for one chunk (_MISSING if absent)"""
+        column = self.meta['columns'][name]
+        value = self._columns[name][index]
+        if column['kind'] == 'str':
+            return self._column_values(name)[value] if value >= 0 else _MISSING
+        return value.item()
+    
+    def __getitem__(self, index):
+        """Chunk dict (or list of dicts for a slice), built from the columns"""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("chunk index out of range")
+        
+        chunk = {'content': self.content(index)}
+        extras = self._extras_row(index)
+        for name in self._fields:
+            if name in self._columns:
+                value = self._field(name, index)
+            else:
+                value = extras.get(name, _MISSING)
+            if value is not _MISSING:
+                chunk[name] = value
+        return chunk
+
+
 class SimpleStorageManager:
     """Simple but robust storage for Azure RAG foundation"""
     
+    # session_id -> metadata header for every saved session, so listing
+    # and cleanup never open the sessions themselves
+    CATALOG_FILE = "sessions_catalog.json"
+    
     def __init__(self, config):
         """Initialize with configuration"""
         self.config = config
@@ -377,45 +1284,46 @@ class SimpleStorageManager:
         if session_id is None:
             session_id = self._generate_session_id()
         
-        # Prepare storage data
-        storage_data = {
-            'metadata': {
-                'session_id': session_id,
-                'source_name': source_name,
-                'created_at': datetime.now().isoformat(),
-                'total_chunks': len(chunks),
-                'chunk_size_config': self.config.CHUNK_SIZE,
-                'chunk_overlap_config': self.config.CHUNK_OVERLAP,
-                'total_characters': sum(chunk['char_count'] for chunk in chunks),
-                'total_words': sum(chunk['word_count'] for chunk in chunks)
-            },
-            'chunks': chunks
+        # Prepare storage metadata
+        metadata = {
+            'session_id': session_id,
+            'source_name': source_name,
+            'created_at': datetime.now().isoformat(),
+            'total_chunks': len(chunks),
+            'chunk_size_config': self.config.CHUNK_SIZE,
+            'chunk_overlap_config': self.config.CHUNK_OVERLAP,
+            'total_characters': sum(chunk['char_count'] for chunk in chunks),
+            'total_words': sum(chunk['word_count'] for chunk in chunks),
+            'next_chunk_id': max(chunk['chunk_id'] for chunk in chunks) + 1
         }
         
-        # Save as JSON (human readable)
-        json_file = self.storage_path / f"{session_id}_chunks.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(storage_data, f, indent=2, ensure_ascii=False)
-        
-        # Save as pickle (faster loading)
-        pickle_file = self.storage_path / f"{session_id}_chunks.pkl"
-        with open(pickle_file, 'wb') as f:
-            pickle.dump(storage_data, f)
+        # Save as a columnar store (memory-mapped on load)
+        store_path = ChunkStore.write(self.storage_path / f"{session_id}_chunks", chunks, metadata)
+        self._update_catalog(session_id, self._catalog_entry(metadata, ChunkStore.FORMAT))
         
         print(f"✅ Saved {len(chunks)} chunks:")
-        print(f"   📄 JSON: {json_file.name}")
-        print(f"   🚀 Pickle: {pickle_file.name}")
+        print(f"   🗂️  Columnar store: {store_path.name}/")
         print(f"   🔖 Session ID: {session_id}")
         
         return session_id
     
     def load_chunks(self, session_id):
-        """Load chunks from storage"""
+        """Load chunks from storage
+        
+        Columnar sessions return a memory-mapped ChunkStore (a read-only
+        sequence of chunk dicts); sessions saved as pickle/JSON by older
+        versions are still loaded into a list.
+        """
+        store_path = self.storage_path / f"{session_id}_chunks"
         pickle_file = self.storage_path / f"{session_id}_chunks.pkl"
         json_file = self.storage_path / f"{session_id}_chunks.json"
         
+        if (store_path / ChunkStore.META_FILE).exists():
+            print(f"📚 Opening columnar store: {store_path.name}/")
+            store = ChunkStore(store_path)
+            data = {'chunks': store, 'metadata': store.metadata}
         # Try pickle first (faster)
-        if pickle_file.exists():
+        elif pickle_file.exists():
             print(f"📚 Loading from pickle: {pickle_file.name}")
             with open(pickle_file, 'rb') as f:
                 data = pickle.load(f)
@@ -453,6 +1361,8 @@ class SimpleStorageManager:
                 'statistics': searcher.get_search_statistics()
             },
             'search_index': searcher.search_index,
+            'doc_lengths': getattr(searcher, 'doc_lengths', None),
+            'doc_ids': getattr(searcher, 'doc_ids', None),
             'chunks_metadata': [{
                 'chunk_id': chunk['chunk_id'],
                 'source': chunk['source'],
@@ -491,49 +1401,126 @@ class SimpleStorageManager:
         
         return search_index, metadata
     
+    def _load_catalog(self):
+        """Session catalog: session_id -> metadata header (empty if missing or unreadable)"""
+        try:
+            with open(self.storage_path / self.CATALOG_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)['sessions']
+        except (OSError, ValueError, KeyError):
+            return {}
+    
+    def _save_catalog(self, catalog):
+        """Write the session catalog (atomically, via a temp file)"""
+        catalog_file = self.storage_path / self.CATALOG_FILE
+        temp_file = catalog_file.with_name(catalog_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': catalog}, f, indent=2, ensure_ascii=False)
+        temp_file.replace(catalog_file)
+    
+    def _catalog_entry(self, metadata, session_format):
+        """The metadata fields kept in the catalog for one session"""
+        return {
+            'source_name': metadata['source_name'],
+            'created_at': metadata['created_at'],
+            'total_chunks': metadata['total_chunks'],
+            'format': session_format
+        }
+    
+    def _update_catalog(self, session_id, entry):
+        """Add or replace one session's catalog entry"""
+        catalog = self._load_catalog()
+        catalog[session_id] = entry
+        self._save_catalog(catalog)
+    
+    def _scan_session_files(self):
+        """One directory listing -> {session_id: set of file kinds present}"""
+        suffixes = (('_chunks.json', 'json'), ('_chunks.pkl', 'pickle'), ('_search_index.pkl', 'index'))
+        files = {}
+        for entry in os.scandir(self.storage_path):
+            name = entry.name
+            if name.endswith('_chunks') and entry.is_dir():
+                files.setdefault(name[:-len('_chunks')], set()).add('columnar')
+                continue
+            for suffix, kind in suffixes:
+                if name.endswith(suffix):
+                    files.setdefault(name[:-len(suffix)], set()).add(kind)
+                    break
+        return files
+    
+    def _read_session_header(self, session_id, kinds):
+        """Catalog entry from a session's own files (meta.json, or a legacy full JSON)"""
+        if 'columnar' in kinds:
+            with open(self.storage_path / f"{session_id}_chunks" / ChunkStore.META_FILE, 'r', encoding='utf-8') as f:
+                return self._catalog_entry(json.load(f)['metadata'], ChunkStore.FORMAT)
+        with open(self.storage_path / f"{session_id}_chunks.json", 'r', encoding='utf-8') as f:
+            return self._catalog_entry(json.load(f)['metadata'], 'json')
+    
+    def _session_catalog(self):
+        """Catalog reconciled with the files on disk
+        
+        Only sessions missing from the catalog (saved by older versions or
+        copied in by hand) have their headers read; entries whose files are
+        gone are dropped. The catalog is rewritten only if it changed.
+        """
+        files = self._scan_session_files()
+        catalog = self._load_catalog()
+        changed = False
+        
+        for session_id in list(catalog):
+            if not files.get(session_id, set()) & {'columnar', 'json'}:
+                del catalog[session_id]
+                changed = True
+        
+        for session_id, kinds in files.items():
+            if session_id in catalog or not kinds & {'columnar', 'json'}:
+                continue
+            try:
+                catalog[session_id] = self._read_session_header(session_id, kinds)
+                changed = True
+            except Exception as e:
+                print(f"   ⚠️  Error reading session {session_id}: {e}")
+        
+        if changed:
+            self._save_catalog(catalog)
+        return catalog, files
+    
     def list_saved_sessions(self):
-        """List all saved sessions"""
-        json_files = list(self.storage_path.glob("*_chunks.json"))
+        """List all saved sessions (from the session catalog)"""
+        catalog, files = self._session_catalog()
         
-        if not json_files:
+        if not catalog:
             print("📭 No saved sessions found")
             return []
         
         sessions = []
-        print(f"📚 Found {len(json_files)} saved sessions:")
-        
-        for json_file in sorted(json_files):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                metadata = data['metadata']
-                session_id = metadata['session_id']
-                
-                # Check for corresponding files
-                has_pickle = (self.storage_path / f"{session_id}_chunks.pkl").exists()
-                has_index = (self.storage_path / f"{session_id}_search_index.pkl").exists()
-                
-                session_info = {
-                    'session_id': session_id,
-                    'source_name': metadata['source_name'],
-                    'created_at': metadata['created_at'],
-                    'total_chunks': metadata['total_chunks'],
-                    'has_pickle': has_pickle,
-                    'has_search_index': has_index
-                }
-                
-                sessions.append(session_info)
-                
-                print(f"   📄 {session_id}")
-                print(f"      📚 Source: {metadata['source_name']}")
-                print(f"      📅 Created: {metadata['created_at']}")
-                print(f"      📦 Chunks: {metadata['total_chunks']}")
-                print(f"      🚀 Pickle: {'✅' if has_pickle else '❌'}")
-                print(f"      🔍 Index: {'✅' if has_index else '❌'}")
-                
-            except Exception as e:
-                print(f"   ⚠️  Error reading {json_file.name}: {e}")
+        print(f"📚 Found {len(catalog)} saved sessions:")
+        
+        for session_id in sorted(catalog):
+            entry = catalog[session_id]
+            kinds = files.get(session_id, set())
+            is_columnar = entry['format'] == ChunkStore.FORMAT
+            has_pickle = 'pickle' in kinds
+            has_index = 'index' in kinds
+            
+            session_info = {
+                'session_id': session_id,
+                'source_name': entry['source_name'],
+                'created_at': entry['created_at'],
+                'total_chunks': entry['total_chunks'],
+                'format': entry['format'],
+                'has_pickle': has_pickle,
+                'has_search_index': has_index
+            }
+            
+            sessions.append(session_info)
+            
+            print(f"   📄 {session_id}")
+            print(f"      📚 Source: {entry['source_name']}")
+            print(f"      📅 Created: {entry['created_at']}")
+            print(f"      📦 Chunks: {entry['total_chunks']}")
+            print(f"      🗂️  Columnar: {'✅' if is_columnar else '❌'}")
+            print(f"      🚀 Pickle: {'✅' if has_pickle else '❌'}")
+            print(f"      🔍 Index: {'✅' if has_index else '❌'}")
         
         return sessions
     
@@ -554,6 +1541,11 @@ class SimpleStorageManager:
         for session in sessions_to_delete:
             session_id = session['session_id']
             
+            store_path = self.storage_path / f"{session_id}_chunks"
+            if store_path.is_dir():
+                shutil.rmtree(store_path)
+                print(f"   🗑️  Deleted: {store_path.name}/")
+            
             # Delete all files for this session
             files_to_delete = [
                 f"{session_id}_chunks.json",
@@ -567,4 +1559,9 @@ class SimpleStorageManager:
                     file_path.unlink()
                     print(f"   🗑️  Deleted: {filename}")
         
+        catalog = self._load_catalog()
+        for session in sessions_to_delete:
+            catalog.pop(session['session_id'], None)
+        self._save_catalog(catalog)
+        
         print(f"✅ Cleanup complete, kept {keep_latest} latest sessions")
\ No newline at end of file
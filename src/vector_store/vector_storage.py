@@ -0,0 +1,490 @@
+"""
+FAISS Vector Storage for Azure RAG
+Native vector store on faiss-cpu: exact (Flat), inverted-file (IVF) and
+graph (HNSW) indexes over normalized embeddings, optionally compressed
+(SQ8, PQ, OPQ+PQ) with exact re-ranking, with on-disk persistence,
+doc_type filtering and batched search behind the LangChain VectorStore API
+"""
+
+import json
+import math
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from models.embedding_models import LocalEmbeddingEngine, embedding_model_id
+from src.utils.foundation import ChunkStore
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+QUANTIZATIONS = ("none", "sq8", "pq", "opq")
+
+# Smallest corpora that can train each quantizer (~39 points per centroid);
+# below them opq falls back to pq and pq to sq8
+PQ_MIN_BITS = 4
+PQ_MIN_VECTORS = 39 * 2 ** PQ_MIN_BITS
+OPQ_MIN_VECTORS = 39 * 256
+
+
+def _import_faiss():
+    """faiss, with a helpful error if faiss-cpu is missing"""
+    try:
+        import faiss
+    except ImportError as e:
+        raise ImportError("FaissVectorStore requires faiss-cpu (pip install faiss-cpu)") from e
+    return faiss
+
+
+def _normalize(vectors) -> np.ndarray:
+    """Rows as contiguous float32 unit vectors (inner product == cosine)"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+class FaissVectorStore(VectorStore):
+    """LangChain vector store backed by a FAISS index
+
+    Vectors are L2-normalized and compared by inner product, so scores are
+    cosine similarities (higher is better). Row i of the index is document
+    i; texts and metadata are kept in a ChunkStore when persisted, so a
+    loaded store materializes only the documents a search returns.
+
+    Index types:
+        flat: exact search, no training
+        ivf:  IVFFlat, k-means trained on the first batch added; searches
+              nprobe of nlist lists
+        hnsw: HNSWFlat graph with hnsw_m links per node; searches with
+              ef_search candidates (no training, best latency at scale)
+
+    Quantization (how the index stores vectors):
+        none: float32, 4 * dim bytes per vector
+        sq8:  int8 scalar quantization, dim bytes per vector
+        pq:   product quantization, pq_m bytes per vector
+        opq:  pq after a learned rotation (better recall at the same size)
+
+    pq and opq are trained on the first batch added. Below OPQ_MIN_VECTORS
+    opq falls back to pq, which uses fewer bits per code on small batches
+    and falls back to sq8 below PQ_MIN_VECTORS; quantization then reports
+    what was built and requested_quantization what was asked for.
+
+    A compressed index returns a shortlist of k * rerank_factor candidates
+    that are re-scored exactly against the float32 vectors. Those are kept
+    next to the index (vectors.f32) and memory-mapped, so only shortlisted
+    rows are paged in. HNSW graph links (~8 * hnsw_m bytes per vector) are
+    not compressed; ivf is the smallest compressed layout.
+    """
+
+    INDEX_FILE = "index.faiss"
+    CONFIG_FILE = "config.json"
+    DOCUMENTS_DIR = "documents"
+    DOC_TYPES_FILE = "doc_type_codes.npy"
+    VECTORS_FILE = "vectors.f32"
+
+    def __init__(self, embedding: Embeddings, index_type: str = "hnsw", nlist: int = 1024,
+                 nprobe: int = 16, hnsw_m: int = 32, ef_construction: int = 128, ef_search: int = 64,
+                 quantization: str = "none", pq_m: int = 0, rerank_factor: int = 4):
+        """
+        Args:
+            embedding: Embeddings used for documents and queries
+            index_type: "flat", "ivf" or "hnsw"
+            nlist: Upper bound on IVF lists (clamped to ~4*sqrt(n) at training)
+            nprobe: IVF lists searched per query
+            hnsw_m: HNSW links per node
+            ef_construction: HNSW candidate list size while building
+            ef_search: HNSW candidate list size while searching (at least k)
+            quantization: "none", "sq8", "pq" or "opq"
+            pq_m: PQ bytes per vector (must divide the dimension; 0 = dim / 8)
+            rerank_factor: Shortlist size as a multiple of k for exact re-ranking
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}")
+
+        self.embedding = embedding
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.quantization = quantization
+        self.requested_quantization = quantization  # differs from quantization after a fallback
+        self.pq_m = pq_m
+        self.rerank_factor = max(1, rerank_factor)
+
+        self.index = None
+        self.dimension = None
+        self.embedding_model = None            # embedding_model_id() of the model the vectors came from
+        self.vectors = None                    # float32 rows for re-ranking (compressed indexes only)
+        self.documents = []                    # records: {'content', 'document': {'id', 'metadata'}}
+        self.doc_type_values: List[str] = []   # doc_type code -> value
+        self._doc_type_codes = {}              # doc_type value -> code
+        self.doc_type_codes = np.zeros(0, dtype=np.int32)  # per row, -1 = no doc_type
+        self._selectors = {}
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding
+
+    def __len__(self):
+        return 0 if self.index is None else self.index.ntotal
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _ivf_lists(self, count: int) -> int:
+        """IVF list count: ~4*sqrt(n), at least ~39 training points per list, at most nlist"""
+        return max(1, min(self.nlist, int(4 * math.sqrt(count)), count // 39 or 1))
+
+    def _pq_subquantizers(self, dimension: int) -> int:
+        """PQ sub-vector count (bytes per vector at 8 bits)"""
+        if self.pq_m:
+            if dimension % self.pq_m:
+                raise ValueError(f"pq_m={self.pq_m} does not divide the dimension {dimension}")
+            return self.pq_m
+        return next(m for m in range(max(1, dimension // 8), 0, -1) if dimension % m == 0)
+
+    def _base_index(self, index=None):
+        """The index under an OPQ rotation (the index itself otherwise)"""
+        faiss = _import_faiss()
+        index = self.index if index is None else index
+        if isinstance(index, faiss.IndexPreTransform):
+            return faiss.downcast_index(index.index)
+        return index
+
+    def _create_compressed_index(self, vectors: np.ndarray):
+        """Trained SQ8 / PQ / OPQ+PQ index (via index_factory) for the configured type"""
+        faiss = _import_faiss()
+        count, dimension = vectors.shape
+
+        if self.quantization != "sq8":
+            # 2^bits centroids per sub-vector need ~39 training points each
+            bits = min(8, int(math.log2(max(1, count // 39))))
+            if self.quantization == "opq" and bits < 8:
+                # The OPQ rotation is trained with a 256-centroid PQ of its own
+                print(f"⚠️  OPQ needs {OPQ_MIN_VECTORS:,} vectors to train, got {count:,}: using pq")
+                self.quantization = "pq"
+            if bits < PQ_MIN_BITS:
+                print(f"⚠️  PQ needs {PQ_MIN_VECTORS:,} vectors to train, got {count:,}: using sq8")
+                self.quantization = "sq8"
+
+        if self.quantization == "sq8":
+            description = "SQ8"
+        else:
+            subquantizers = self._pq_subquantizers(dimension)
+            description = f"PQ{subquantizers}x{bits}"
+
+        if self.index_type == "ivf":
+            description = f"IVF{self._ivf_lists(count)},{description}"
+        elif self.quantization != "sq8" and self.index_type == "flat":
+            # IndexPQ cannot filter with an ID selector; a single inverted
+            # list is the same exhaustive PQ scan and can
+            description = f"IVF1,{description}"
+        elif self.index_type == "hnsw":
+            description = f"HNSW{self.hnsw_m},{description}"
+        if self.quantization == "opq":
+            description = f"OPQ{subquantizers},{description}"
+
+        index = faiss.index_factory(dimension, description, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "hnsw":
+            self._base_index(index).hnsw.efConstruction = self.ef_construction
+
+        sample = vectors
+        if count > 65536:
+            sample = vectors[np.random.default_rng(0).choice(count, 65536, replace=False)]
+        index.train(sample)
+        return index
+
+    def _create_index(self, vectors: np.ndarray):
+        """New empty index for the configured type (IVF is trained on vectors)"""
+        faiss = _import_faiss()
+        dimension = vectors.shape[1]
+
+        if self.quantization != "none":
+            return self._create_compressed_index(vectors)
+
+        if self.index_type == "flat":
+            return faiss.IndexFlatIP(dimension)
+
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.ef_construction
+            return index
+
+        nlist = self._ivf_lists(len(vectors))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        sample = vectors
+        if len(vectors) > 256 * nlist:
+            sample = vectors[np.random.default_rng(0).choice(len(vectors), 256 * nlist, replace=False)]
+        index.train(sample)
+        return index
+
+    def _doc_type_code(self, metadata: Dict) -> int:
+        """Dictionary code of a document's doc_type (-1 if it has none)"""
+        doc_type = metadata.get('doc_type')
+        if doc_type is None:
+            return -1
+        code = self._doc_type_codes.get(doc_type)
+        if code is None:
+            code = self._doc_type_codes[doc_type] = len(self.doc_type_values)
+            self.doc_type_values.append(doc_type)
+        return code
+
+    def add_vectors(self, vectors, texts: List[str], metadatas: Optional[List[Dict]] = None,
+                    ids: Optional[List[str]] = None) -> List[str]:
+        """Add precomputed embeddings with their texts; returns the document ids"""
+        vectors = _normalize(vectors)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Got {len(vectors)} vectors for {len(texts)} texts")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+
+        if self.index is None:
+            self.index = self._create_index(vectors)
+            self.dimension = vectors.shape[1]
+            if self.embedding is not None:
+                self.embedding_model = embedding_model_id(self.embedding)
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d vectors, got {vectors.shape[1]}-d")
+
+        if isinstance(self.documents, ChunkStore):
+            # Loaded stores are read-only; materialize before appending
+            self.documents = list(self.documents)
+
+        self.index.add(vectors)
+        if self.quantization != "none":
+            # Loaded vectors are a read-only memmap; appending copies them into memory
+            self.vectors = vectors if self.vectors is None else np.concatenate([self.vectors, vectors])
+        self.documents.extend({'content': text, 'document': {'id': doc_id, 'metadata': dict(metadata)}}
+                              for text, metadata, doc_id in zip(texts, metadatas, ids))
+        codes = np.array([self._doc_type_code(metadata) for metadata in metadatas], dtype=np.int32)
+        self.doc_type_codes = np.concatenate([self.doc_type_codes, codes])
+        self._selectors.clear()
+        return list(ids)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[Dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed and add texts; returns the document ids"""
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_vectors(self.embedding.embed_documents(texts), texts, metadatas, ids)
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[Dict]] = None, *,
+                   ids: Optional[List[str]] = None, **kwargs: Any) -> "FaissVectorStore":
+        """Build a store over texts (kwargs are FaissVectorStore options)"""
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _selector(self, doc_types):
+        """Cached faiss ID selector for rows whose doc_type is one of doc_types"""
+        faiss = _import_faiss()
+        key = tuple(sorted(doc_types))
+        entry = self._selectors.get(key)
+        if entry is None:
+            codes = [self._doc_type_codes[value] for value in key if value in self._doc_type_codes]
+            mask = np.isin(self.doc_type_codes, codes)
+            bitmap = np.packbits(mask, bitorder='little')
+            # The selector points into bitmap: keep both alive together
+            entry = self._selectors[key] = (faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap)), bitmap)
+        return entry[0]
+
+    def _search_parameters(self, k: int, filter: Optional[Dict]):
+        """Per-call faiss search parameters (nprobe / efSearch, doc_type selector)"""
+        faiss = _import_faiss()
+        params = {}
+        if filter:
+            unsupported = set(filter) - {'doc_type'}
+            if unsupported:
+                raise ValueError(f"FaissVectorStore only filters on doc_type, got {sorted(unsupported)}")
+            doc_types = filter['doc_type']
+            if isinstance(doc_types, dict):
+                doc_types = doc_types.get('$in', doc_types.get('$eq'))
+            if isinstance(doc_types, str):
+                doc_types = [doc_types]
+            params['sel'] = self._selector(doc_types)
+
+        base_index = self._base_index()
+        if isinstance(base_index, faiss.IndexIVF):
+            search_params = faiss.SearchParametersIVF(nprobe=min(self.nprobe, base_index.nlist), **params)
+        elif isinstance(base_index, faiss.IndexHNSW):
+            search_params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k), **params)
+        elif params:
+            search_params = faiss.SearchParameters(**params)
+        else:
+            return None
+
+        if isinstance(self.index, faiss.IndexPreTransform):
+            # OPQ: parameters apply to the index under the rotation
+            inner_params = search_params
+            search_params = faiss.SearchParametersPreTransform(index_params=inner_params)
+            search_params.referenced_objects = [inner_params]
+        return search_params
+
+    def _rerank(self, queries: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact cosine scores of shortlisted rows from the float32 vectors; best k per query"""
+        valid = rows >= 0
+        candidates = self.vectors[np.where(valid, rows, 0)]          # (queries, shortlist, dim)
+        scores = np.einsum('qsd,qd->qs', candidates, queries)
+        scores[~valid] = -np.inf
+
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        rows[np.isinf(scores)] = -1
+        return scores, rows
+
+    def search_rows(self, vectors, k: int = 4, filter: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(scores, rows) of the top-k per query vector (rows are -1 past the available hits)
+
+        Compressed indexes fetch k * rerank_factor candidates and re-rank
+        them exactly.
+        """
+        vectors = _normalize(vectors)
+        shortlist = k if self.vectors is None else k * self.rerank_factor
+        shortlist = min(shortlist, len(self))
+
+        scores, rows = self.index.search(vectors, shortlist, params=self._search_parameters(shortlist, filter))
+        if self.vectors is not None:
+            scores, rows = self._rerank(vectors, rows, k)
+        return scores, rows
+
+    def _document(self, row: int) -> Document:
+        """Document for an index row"""
+        record = self.documents[row]
+        return Document(page_content=record['content'], metadata=dict(record['document']['metadata']),
+                        id=record['document']['id'])
+
+    def search_vectors(self, vectors, k: int = 4, filter: Optional[Dict] = None) -> List[List[Tuple[Document, float]]]:
+        """Top-k (Document, cosine similarity) per query vector, in one faiss call"""
+        if self.index is None or not len(self):
+            return [[] for _ in _normalize(vectors)]
+
+        scores, rows = self.search_rows(vectors, k=k, filter=filter)
+        return [[(self._document(int(row)), float(score))
+                 for score, row in zip(query_scores, query_rows) if row >= 0]
+                for query_scores, query_rows in zip(scores, rows)]
+
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Query embeddings, in one batch for the local engine"""
+        if isinstance(self.embedding, LocalEmbeddingEngine):
+            return self.embedding.encode(queries)
+        return np.array([self.embedding.embed_query(query) for query in queries], dtype=np.float32)
+
+    def search_batch(self, queries: List[str], k: int = 4, filter: Optional[Dict] = None) -> List[List[Tuple[Document, float]]]:
+        """Top-k (Document, score) lists for many queries"""
+        if not queries:
+            return []
+        return self.search_vectors(self._embed_queries(list(queries)), k=k, filter=filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[Dict] = None,
+                                    **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.search_vectors([embedding], k=k, filter=filter)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Top-k (Document, cosine similarity) for a query"""
+        return self.search_vectors([self.embedding.embed_query(query)], k=k, filter=filter)[0]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        """Top-k Documents for a query, optionally restricted to filter={'doc_type': ...}"""
+        return [document for document, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def memory_usage(self) -> Dict:
+        """Bytes held by the faiss index in RAM vs. the memory-mapped float32 vectors"""
+        faiss = _import_faiss()
+        index_bytes = len(faiss.serialize_index(self.index)) if self.index is not None else 0
+        vectors_bytes = 0 if self.vectors is None else self.vectors.size * 4
+        return {
+            'index_bytes': index_bytes,
+            'bytes_per_vector': index_bytes / len(self) if len(self) else 0.0,
+            'rerank_vectors_bytes': vectors_bytes
+        }
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save_local(self, folder):
+        """Write the index, documents and settings to folder"""
+        faiss = _import_faiss()
+        if self.index is None:
+            raise ValueError("Cannot save an empty FaissVectorStore")
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        faiss.write_index(self.index, str(folder / self.INDEX_FILE))
+        ChunkStore.write(folder / self.DOCUMENTS_DIR, self.documents, {'count': len(self.documents)})
+        np.save(folder / self.DOC_TYPES_FILE, self.doc_type_codes)
+        if self.vectors is not None:
+            np.ascontiguousarray(self.vectors, dtype=np.float32).tofile(folder / self.VECTORS_FILE)
+
+        settings = {
+            'index_type': self.index_type,
+            'embedding_model': self.embedding_model,
+            'dimension': self.dimension,
+            'nlist': self.nlist,
+            'nprobe': self.nprobe,
+            'hnsw_m': self.hnsw_m,
+            'ef_construction': self.ef_construction,
+            'ef_search': self.ef_search,
+            'quantization': self.quantization,
+            'requested_quantization': self.requested_quantization,
+            'pq_m': self.pq_m,
+            'rerank_factor': self.rerank_factor,
+            'doc_type_values': self.doc_type_values
+        }
+        with open(folder / self.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=2)
+
+    @classmethod
+    def load_local(cls, folder, embedding: Embeddings, **overrides) -> "FaissVectorStore":
+        """Open a store written by save_local (documents stay memory-mapped)
+
+        overrides replace saved search settings, e.g. nprobe, ef_search or
+        rerank_factor. The saved embedding_model and dimension are kept on
+        the store (embedding_model is None for stores saved without one) so
+        callers can check them against the query embeddings.
+        """
+        faiss = _import_faiss()
+        folder = Path(folder)
+        with open(folder / cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+
+        doc_type_values = settings.pop('doc_type_values')
+        dimension = settings.pop('dimension')
+        embedding_model = settings.pop('embedding_model', None)
+        requested_quantization = settings.pop('requested_quantization', settings['quantization'])
+        store = cls(embedding, **{**settings, **overrides})
+        store.requested_quantization = requested_quantization
+        store.index = faiss.read_index(str(folder / cls.INDEX_FILE))
+        store.dimension = dimension
+        store.embedding_model = embedding_model
+        store.documents = ChunkStore(folder / cls.DOCUMENTS_DIR)
+        store.doc_type_values = doc_type_values
+        store._doc_type_codes = {value: code for code, value in enumerate(doc_type_values)}
+        store.doc_type_codes = np.load(folder / cls.DOC_TYPES_FILE)
+        if store.quantization != "none":
+            store.vectors = np.memmap(folder / cls.VECTORS_FILE, dtype=np.float32, mode='r',
+                                      shape=(store.index.ntotal, dimension))
+        return store